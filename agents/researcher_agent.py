@@ -1,6 +1,5 @@
 from crewai import Agent
-from tools.exa_tools import ExaSearchTool
-from tools.quora_tools import QuoraSearchTool
+from tools.fanout_tools import FanOutSearchTool
 
 class ResearcherAgent:
     @staticmethod
@@ -11,7 +10,7 @@ class ResearcherAgent:
             backstory="""You are an expert lead researcher with years of experience 
             in identifying high-quality leads. You know how to find people actively 
             discussing or seeking solutions in specific domains.""",
-            tools=[ExaSearchTool(), QuoraSearchTool()],
+            tools=[FanOutSearchTool()],
             verbose=True,
             allow_delegation=True
         )
\ No newline at end of file
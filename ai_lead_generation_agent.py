@@ -1,17 +1,36 @@
+# agno, firecrawl, composio, httpx and pyarrow are imported lazily inside the stages
+# that use them so Streamlit reruns and cold starts don't pay for the LLM stack.
+from __future__ import annotations
 import streamlit as st
-import requests
-from agno.agent import Agent
-from agno.tools.firecrawl import FirecrawlTools
-from agno.models.openai import OpenAIChat
-from firecrawl import FirecrawlApp
 from pydantic import BaseModel, Field
-from typing import List
-from composio_agno import Action, ComposioToolSet
+from typing import TYPE_CHECKING, AsyncIterator, Iterable, Iterator, List, Optional
+import asyncio
+import contextvars
+import csv
 import json
 import os
 from dotenv import load_dotenv
 import logging
+import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from tools.extract_cache import ExtractCache, schema_fingerprint
+from tools.fanout_search import fan_out_search, fan_out_search_async
+from tools.lead_index import LeadIndex
+from tools.lead_scheduler import DEFAULT_MAX_EXTRACTS, DEFAULT_TARGET_LEADS, MAX_SEARCH_DEPTH, YieldScheduler
+from tools.lead_records import LEAD_FIELDNAMES, LeadRecord, lead_columns, lead_row
+from tools.pending_writes import PendingWrites
+from tools.rate_limiter import rate_limited_call
+from tools.run_metrics import record_stage, run_report, stage, start_metrics_server
+from tools.registry import shared
+from tools.thread_state import ThreadStateStore, content_hash
+from tools.transform_cache import TransformCache
+
+if TYPE_CHECKING:
+    from agno.agent import Agent
+    from firecrawl import FirecrawlApp
+    from tools.async_clients import AsyncExaClient, AsyncFirecrawlClient
+    from tools.lead_clustering import LeadDeduplicator
 
 # Configure logging
 logging.basicConfig(
@@ -30,6 +49,8 @@ load_dotenv()
 firecrawl_api_key = os.getenv("FIRECRAWL_API_KEY")
 openai_api_key = os.getenv("OPENAI_API_KEY")
 composio_api_key = os.getenv("COMPOSIO_API_KEY")
+# Optional: adds Exa as an extra search source in the fan-out
+exa_api_key = os.getenv("EXA_API_KEY")
 
 class QuoraUserInteractionSchema(BaseModel):
     username: str = Field(description="The username of the user who posted the question or answer")
@@ -43,132 +64,310 @@ class QuoraPageSchema(BaseModel):
     interactions: List[QuoraUserInteractionSchema] = Field(description="List of all user interactions (questions and answers) on the page")
 
 def search_for_urls(company_description: str, firecrawl_api_key: str, num_links: int) -> List[str]:
+    """Fan several query variants (plus Exa when EXA_API_KEY is set) out concurrently and return
+    the ``num_links`` best unique, canonicalized URLs to extract."""
     logger.info(f"Starting URL search for company description: {company_description}")
     logger.info(f"Number of requested links: {num_links}")
     
-    url = "https://api.firecrawl.dev/v1/search"
-    headers = {
-        "Authorization": f"Bearer {firecrawl_api_key}",
-        "Content-Type": "application/json"
-    }
-    query1 = f"quora websites where people are looking for {company_description} services"
-    payload = {
-        "query": query1,
-        "limit": num_links,
-        "lang": "en",
-        "location": "United States",
-        "timeout": 60000,
-    }
-    
-    logger.info(f"Sending search request with query: {query1}")
-    response = requests.post(url, json=payload, headers=headers)
-    
-    if response.status_code == 200:
-        data = response.json()
-        if data.get("success"):
-            results = data.get("data", [])
-            urls = [result["url"] for result in results]
-            logger.info(f"Successfully retrieved {len(urls)} URLs")
-            logger.debug(f"Retrieved URLs: {urls}")
-            return urls
-    
-    logger.error(f"Failed to retrieve URLs. Status code: {response.status_code}")
-    return []
+    results = fan_out_search(company_description, firecrawl_api_key, top_k=num_links, exa_api_key=exa_api_key)
+    urls = [result["url"] for result in results]
+    if urls:
+        logger.info(f"Successfully retrieved {len(urls)} URLs")
+        logger.debug(f"Retrieved URLs: {urls}")
+    else:
+        logger.error("Failed to retrieve URLs")
+    return urls
 
-def extract_user_info_from_urls(urls: List[str], firecrawl_api_key: str) -> List[dict]:
-    logger.info(f"Starting user info extraction from {len(urls)} URLs")
-    user_info_list = []
-    firecrawl_app = FirecrawlApp(api_key=firecrawl_api_key)
-    
-    try:
-        for url in urls:
-            logger.info(f"Processing URL: {url}")
-            response = firecrawl_app.extract(
+async def search_for_urls_async(company_description: str, client: AsyncFirecrawlClient, num_links: int,
+                                exa_client: Optional[AsyncExaClient] = None) -> List[str]:
+    """Async counterpart of search_for_urls using pooled async clients."""
+    logger.info(f"Starting async URL search for company description: {company_description}")
+    results = await fan_out_search_async(company_description, client, top_k=num_links, exa_client=exa_client)
+    urls = [result["url"] for result in results]
+    if urls:
+        logger.info(f"Successfully retrieved {len(urls)} URLs")
+    else:
+        logger.error("Failed to retrieve URLs")
+    return urls
+
+EXTRACT_PROMPT = 'Extract all user information including username, bio, post type (question/answer), timestamp, upvotes, and any links from Quora posts. Focus on identifying potential leads who are asking questions or providing answers related to the topic.'
+
+# Maximum number of Firecrawl extract calls in flight at once
+DEFAULT_MAX_WORKERS = 4
+
+# Seconds between live leads table refreshes; re-sending the whole table per lead is quadratic in the lead count
+TABLE_REFRESH_SECONDS = 1.0
+
+@st.cache_resource
+def get_extract_cache() -> ExtractCache:
+    """Process-wide on-disk cache of extract responses, shared across Streamlit reruns."""
+    return ExtractCache()
+
+@st.cache_resource
+def get_thread_state() -> ThreadStateStore:
+    """Process-wide store of per-thread crawl state for incremental recrawls."""
+    return ThreadStateStore()
+
+def make_lead_deduplicator() -> LeadDeduplicator:
+    """Near-duplicate merging for one run; repeats of earlier runs' leads are the lead index's job."""
+    from tools.lead_clustering import LeadDeduplicator
+    return LeadDeduplicator()
+
+def scrape_content_hash(firecrawl_app: FirecrawlApp, url: str) -> Optional[str]:
+    """Hash a cheap markdown scrape of the page. Returns None if the scrape failed."""
+    with stage("change_check", items_in=1) as span:
+        try:
+            page = rate_limited_call("firecrawl", firecrawl_app.scrape_url, url, {'formats': ['markdown']})
+        except Exception as e:
+            logger.warning(f"Change check scrape failed for {url}, extracting anyway: {str(e)}")
+            return None
+        markdown = (page or {}).get('markdown')
+        span.items_out = int(bool(markdown))
+    return content_hash(markdown) if markdown else None
+
+async def scrape_content_hash_async(client: AsyncFirecrawlClient, url: str) -> Optional[str]:
+    """Async counterpart of scrape_content_hash."""
+    with stage("change_check", items_in=1) as span:
+        try:
+            page = await client.scrape(url)
+        except Exception as e:
+            logger.warning(f"Change check scrape failed for {url}, extracting anyway: {str(e)}")
+            return None
+        markdown = (page or {}).get('markdown')
+        span.items_out = int(bool(markdown))
+    return content_hash(markdown) if markdown else None
+
+def new_user_info(url: str, response: dict, thread_state: Optional[ThreadStateStore], digest: Optional[str]) -> Optional[dict]:
+    """Turn an extract response into a user info entry, keeping only interactions the thread state hasn't seen."""
+    info = user_info_from_response(url, response)
+    if thread_state is None or not (response.get('success') and response.get('status') == 'completed'):
+        return info
+    new_interactions = thread_state.record_extraction(url, digest, info["user_info"] if info else [])
+    if info and len(new_interactions) < len(info["user_info"]):
+        logger.info(f"{len(new_interactions)} of {len(info['user_info'])} interactions on {url} are new")
+    return {"website_url": url, "user_info": new_interactions} if new_interactions else None
+
+def extract_user_info_from_url(firecrawl_app: FirecrawlApp, url: str, cache: Optional[ExtractCache] = None,
+                               thread_state: Optional[ThreadStateStore] = None,
+                               extracted: Optional[List[str]] = None) -> Optional[dict]:
+    """Extract user interactions from a single URL. Returns None when nothing (new) was extracted.
+
+    With a thread state store, a thread extracted before is first re-checked
+    with a cheap scrape: unchanged pages skip the extract entirely, and changed
+    ones only pass on interactions not emitted before. A page whose hash is
+    being recorded is always extracted fresh rather than from the cache.
+    The URL is appended to ``extracted`` unless the extract was skipped.
+    """
+    logger.info(f"Processing URL: {url}")
+    digest = None
+    if thread_state is not None:
+        digest = scrape_content_hash(firecrawl_app, url)
+        if thread_state.is_unchanged(url, digest):
+            logger.info(f"Thread unchanged since last extraction, skipping: {url}")
+            return None
+    if extracted is not None:
+        extracted.append(url)
+    schema = QuoraPageSchema.model_json_schema()
+    fingerprint = schema_fingerprint(EXTRACT_PROMPT, schema)
+    with stage("extract", items_in=1) as span:
+        # The scrape hash is recorded with this extraction, so it must describe the same content: no cached
+        # response, which may predate the scrape and miss interactions posted since
+        use_cache = cache is not None and digest is None
+        response = cache.get(url, fingerprint) if use_cache else None
+        if response is None:
+            response = rate_limited_call(
+                "firecrawl",
+                firecrawl_app.extract,
                 [url],
                 {
-                    'prompt': 'Extract all user information including username, bio, post type (question/answer), timestamp, upvotes, and any links from Quora posts. Focus on identifying potential leads who are asking questions or providing answers related to the topic.',
-                    'schema': QuoraPageSchema.model_json_schema(),
+                    'prompt': EXTRACT_PROMPT,
+                    'schema': schema,
                 }
             )
+            if cache and response.get('success') and response.get('status') == 'completed':
+                cache.set(url, fingerprint, response)
+        else:
+            logger.info(f"Using cached extraction for URL: {url}")
+        span.items_out = len(response.get('data', {}).get('interactions', []) or [])
 
-            logger.debug(f"Firecrawl extraction response for {url}: {json.dumps(response, indent=2)}")
-            
-            if response.get('success') and response.get('status') == 'completed':
-                interactions = response.get('data', {}).get('interactions', [])
-                if interactions:
-                    logger.info(f"Successfully extracted {len(interactions)} interactions from {url}")
-                    user_info_list.append({
-                        "website_url": url,
-                        "user_info": interactions
-                    })
-                else:
-                    logger.warning(f"No interactions found for URL: {url}")
-    except Exception as e:
-        logger.error(f"Error extracting user info: {str(e)}", exc_info=True)
+    return new_user_info(url, response, thread_state, digest)
+
+def user_info_from_response(url: str, response: dict) -> Optional[dict]:
+    """Turn an extract response into a user info entry. Returns None when nothing was extracted."""
+    # Only serialize the response when debug logging is actually on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Firecrawl extraction response for {url}: {json.dumps(response, indent=2)}")
     
+    if response.get('success') and response.get('status') == 'completed':
+        interactions = response.get('data', {}).get('interactions', [])
+        if interactions:
+            logger.info(f"Successfully extracted {len(interactions)} interactions from {url}")
+            return {
+                "website_url": url,
+                "user_info": interactions
+            }
+        logger.warning(f"No interactions found for URL: {url}")
+    return None
+
+def iter_user_info_from_urls(urls: List[str], firecrawl_api_key: str, max_workers: int = DEFAULT_MAX_WORKERS,
+                             cache: Optional[ExtractCache] = None,
+                             thread_state: Optional[ThreadStateStore] = None,
+                             extracted: Optional[List[str]] = None) -> Iterator[dict]:
+    """Extract user info from URLs concurrently, yielding each result as soon as it finishes.
+
+    At most ``max_workers`` extract calls run at once. A failure on one URL is
+    logged and skipped without affecting the rest of the batch. URLs that were
+    really extracted, rather than skipped as unchanged, are appended to ``extracted``.
+    """
+    logger.info(f"Starting user info extraction from {len(urls)} URLs (max {max_workers} in flight)")
+    if not urls:
+        return
+    from firecrawl import FirecrawlApp
+    firecrawl_app = FirecrawlApp(api_key=firecrawl_api_key)
+    
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        # Each task runs in a copy of the caller's context so its spans land in the active run report
+        futures = {
+            executor.submit(contextvars.copy_context().run, extract_user_info_from_url, firecrawl_app, url, cache, thread_state, extracted): url
+            for url in urls
+        }
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Error extracting user info from {url}: {str(e)}", exc_info=True)
+                continue
+            if result:
+                yield result
+
+async def extract_user_info_from_url_async(client: AsyncFirecrawlClient, url: str,
+                                           cache: Optional[ExtractCache] = None,
+                                           thread_state: Optional[ThreadStateStore] = None,
+                                           extracted: Optional[List[str]] = None) -> Optional[dict]:
+    """Async counterpart of extract_user_info_from_url using a pooled AsyncFirecrawlClient.
+
+    The SQLite lookups and writes of the cache and thread state run in a
+    thread so they don't stall every other request in flight on the loop.
+    """
+    logger.info(f"Processing URL: {url}")
+    digest = None
+    if thread_state is not None:
+        digest = await scrape_content_hash_async(client, url)
+        if await asyncio.to_thread(thread_state.is_unchanged, url, digest):
+            logger.info(f"Thread unchanged since last extraction, skipping: {url}")
+            return None
+    if extracted is not None:
+        extracted.append(url)
+    schema = QuoraPageSchema.model_json_schema()
+    fingerprint = schema_fingerprint(EXTRACT_PROMPT, schema)
+    with stage("extract", items_in=1) as span:
+        use_cache = cache is not None and digest is None
+        response = await asyncio.to_thread(cache.get, url, fingerprint) if use_cache else None
+        if response is None:
+            response = await client.extract([url], {'prompt': EXTRACT_PROMPT, 'schema': schema})
+            if cache and response.get('success') and response.get('status') == 'completed':
+                await asyncio.to_thread(cache.set, url, fingerprint, response)
+        else:
+            logger.info(f"Using cached extraction for URL: {url}")
+        span.items_out = len(response.get('data', {}).get('interactions', []) or [])
+    return await asyncio.to_thread(new_user_info, url, response, thread_state, digest)
+
+async def aiter_user_info_from_urls(urls: List[str], client: AsyncFirecrawlClient, max_concurrency: int = DEFAULT_MAX_WORKERS,
+                                    cache: Optional[ExtractCache] = None,
+                                    thread_state: Optional[ThreadStateStore] = None,
+                                    extracted: Optional[List[str]] = None) -> AsyncIterator[dict]:
+    """Async counterpart of iter_user_info_from_urls: at most ``max_concurrency`` extract jobs at once, no threads."""
+    logger.info(f"Starting async user info extraction from {len(urls)} URLs (max {max_concurrency} in flight)")
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def extract_one(url: str) -> Optional[dict]:
+        async with semaphore:
+            try:
+                return await extract_user_info_from_url_async(client, url, cache, thread_state, extracted)
+            except Exception as e:
+                logger.error(f"Error extracting user info from {url}: {str(e)}", exc_info=True)
+                return None
+
+    # Tasks inherit the caller's context, so their spans land in the active run report
+    for next_done in asyncio.as_completed([asyncio.ensure_future(extract_one(url)) for url in urls]):
+        result = await next_done
+        if result:
+            yield result
+
+def extract_user_info_from_urls(urls: List[str], firecrawl_api_key: str, max_workers: int = DEFAULT_MAX_WORKERS,
+                                cache: Optional[ExtractCache] = None,
+                                thread_state: Optional[ThreadStateStore] = None) -> List[dict]:
+    user_info_list = list(iter_user_info_from_urls(urls, firecrawl_api_key, max_workers, cache, thread_state))
     logger.info(f"Completed user info extraction. Total successful extractions: {len(user_info_list)}")
     return user_info_list
 
-def format_user_info_to_flattened_json(user_info_list: List[dict]) -> List[dict]:
-    logger.info(f"Starting to flatten user info from {len(user_info_list)} sources")
-    flattened_data = []
-    
-    for info in user_info_list:
+def flatten_interaction(website_url: str, interaction: dict) -> LeadRecord:
+    return LeadRecord.from_interaction(website_url, interaction)
+
+def iter_flattened_records(user_info_iter: Iterable[dict], lead_index: Optional[LeadIndex] = None,
+                           deduplicator: Optional[LeadDeduplicator] = None) -> Iterator[LeadRecord]:
+    """Flatten extraction results into lead records one at a time.
+
+    When a lead index is given, leads already surfaced by earlier runs (same
+    username, URL and bio) are dropped. A deduplicator then merges semantic
+    near-duplicates (same person under another handle or with a copied bio).
+    """
+    for info in user_info_iter:
         website_url = info["website_url"]
-        user_info = info["user_info"]
         logger.debug(f"Processing user info from URL: {website_url}")
-        
-        for interaction in user_info:
-            flattened_interaction = {
-                "Website URL": website_url,
-                "Username": interaction.get("username", ""),
-                "Bio": interaction.get("bio", ""),
-                "Post Type": interaction.get("post_type", ""),
-                "Timestamp": interaction.get("timestamp", ""),
-                "Upvotes": interaction.get("upvotes", 0),
-                "Links": ", ".join(interaction.get("links", [])),
-            }
-            flattened_data.append(flattened_interaction)
+        with stage("flatten", items_in=len(info["user_info"])) as span:
+            records = [flatten_interaction(website_url, interaction) for interaction in info["user_info"]]
+            if lead_index:
+                records = lead_index.filter_new(records)
+            span.items_out = len(records)
+        if deduplicator and records:
+            with stage("dedup", items_in=len(records)) as span:
+                records = deduplicator.merge(records)
+                span.items_out = len(records)
+        yield from records
+
+async def aflatten_user_info(info: dict, lead_index: Optional[LeadIndex] = None,
+                             deduplicator: Optional[LeadDeduplicator] = None) -> List[LeadRecord]:
+    """iter_flattened_records for one extraction, run in a thread: the lead index lookups and embedding block."""
+    return await asyncio.to_thread(lambda: list(iter_flattened_records([info], lead_index, deduplicator)))
+
+def format_user_info_to_flattened_json(user_info_list: List[dict], lead_index: Optional[LeadIndex] = None) -> List[LeadRecord]:
+    logger.info(f"Starting to flatten user info from {len(user_info_list)} sources")
+    flattened_data = list(iter_flattened_records(user_info_list, lead_index))
     
     logger.info(f"Flattening complete. Generated {len(flattened_data)} records")
-    logger.debug(f"Flattened data: {json.dumps(flattened_data, indent=2)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Flattened data: {json.dumps([dict(record) for record in flattened_data], indent=2)}")
     return flattened_data
 
-def create_google_sheets_agent(composio_api_key: str, openai_api_key: str) -> Agent:
-    logger.info("Creating Google Sheets agent")
-    composio_toolset = ComposioToolSet(api_key=composio_api_key)
-    google_sheets_tool = composio_toolset.get_tools(actions=[Action.GOOGLESHEETS_SHEET_FROM_JSON])[0]
-    
-    google_sheets_agent = Agent(
-        model=OpenAIChat(id="gpt-4o-mini", api_key=openai_api_key),
-        tools=[google_sheets_tool],
-        show_tool_calls=True,
-        description="You are an expert at creating and updating Google Sheets. You will be given user information in JSON format, and you need to write it into a new Google Sheet.",
-        markdown=True
-    )
-    logger.info("Google Sheets agent created successfully")
-    return google_sheets_agent
+def make_csv_filename(company_description: str) -> str:
+    """Return a timestamped CSV path in the output directory, creating the directory if needed."""
+    output_dir = "lead_generation_output"
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{output_dir}/leads_{company_description.replace(' ', '_')}_{timestamp}.csv"
 
 def write_to_csv(flattened_data: List[dict], company_description: str) -> str:
     """Write the flattened data to a CSV file and return the file path."""
     logger.info(f"Starting CSV write operation for {len(flattened_data)} records")
     
     try:
-        # Create output directory if it doesn't exist
-        output_dir = "lead_generation_output"
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{output_dir}/leads_{company_description.replace(' ', '_')}_{timestamp}.csv"
+        filename = make_csv_filename(company_description)
         
         # Write to CSV
-        import csv
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            if flattened_data:
-                writer = csv.DictWriter(f, fieldnames=flattened_data[0].keys())
-                writer.writeheader()
-                writer.writerows(flattened_data)
+        with stage("csv_write", items_in=len(flattened_data)) as span:
+            with open(filename, 'w', newline='', encoding='utf-8') as f:
+                if flattened_data:
+                    # Union of keys across all records so later records with extra fields are not dropped
+                    fieldnames = list(LEAD_FIELDNAMES)
+                    for record in flattened_data:
+                        fieldnames.extend(key for key in record if key not in fieldnames)
+                    writer = csv.DictWriter(f, fieldnames=fieldnames)
+                    writer.writeheader()
+                    writer.writerows(flattened_data)
+            span.items_out = len(flattened_data)
+            span.bytes = os.path.getsize(filename)
         
         logger.info(f"Successfully wrote data to CSV: {filename}")
         return filename
@@ -176,35 +375,102 @@ def write_to_csv(flattened_data: List[dict], company_description: str) -> str:
         logger.error(f"Error writing to CSV: {str(e)}", exc_info=True)
         return None
 
-def write_to_google_sheets(flattened_data: List[dict], composio_api_key: str, openai_api_key: str) -> str:
-    """Attempt to write data to Google Sheets (optional)."""
+def iter_append_to_csv(records: Iterable[dict], filename: str) -> Iterator[dict]:
+    """Append each record to the CSV as it arrives and pass it through to the next stage."""
+    logger.info(f"Streaming lead records to CSV: {filename}")
+    count = 0
+    write_time = 0.0
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(LEAD_FIELDNAMES)
+        for record in records:
+            start = time.perf_counter()
+            writer.writerow(lead_row(record))
+            f.flush()
+            write_time += time.perf_counter() - start
+            count += 1
+            yield record
+    record_stage("csv_write", write_time, items_in=count, items_out=count, nbytes=os.path.getsize(filename))
+    logger.info(f"Finished streaming {count} records to CSV: {filename}")
+
+def iter_leads_adaptive(company_description: str, firecrawl_api_key: str, scheduler: YieldScheduler,
+                        max_workers: int = DEFAULT_MAX_WORKERS, cache: Optional[ExtractCache] = None,
+                        lead_index: Optional[LeadIndex] = None,
+                        thread_state: Optional[ThreadStateStore] = None,
+                        deduplicator: Optional[LeadDeduplicator] = None) -> Iterator[LeadRecord]:
+    """Search and extract in batches sized by ``scheduler`` until it stops, yielding unique leads as they arrive.
+
+    Searches page deeper only when the URL pool runs dry, so a query that is
+    saturated after a couple of pages never pays for more extracts. Threads
+    skipped as unchanged don't count as extracts, so the run moves on past them.
+    """
+    while True:
+        batch_size = scheduler.next_batch_size()
+        if not batch_size:
+            break
+        if scheduler.needs_search(batch_size):
+            depth = scheduler.next_search_depth()
+            scheduler.add_search_results(search_for_urls(company_description, firecrawl_api_key, depth), depth)
+        urls = scheduler.take(batch_size)
+        if not urls:
+            continue
+        extracted = []
+        user_info_iter = iter_user_info_from_urls(urls, firecrawl_api_key, max_workers, cache, thread_state, extracted)
+        for record in iter_flattened_records(user_info_iter, lead_index, deduplicator):
+            if scheduler.record_lead(record):
+                yield record
+        scheduler.finish_batch(urls, extracted)
+    logger.info(f"Adaptive lead collection finished: {scheduler.summary()}")
+
+async def aiter_leads_adaptive(company_description: str, client: AsyncFirecrawlClient, scheduler: YieldScheduler,
+                               max_concurrency: int = DEFAULT_MAX_WORKERS, cache: Optional[ExtractCache] = None,
+                               lead_index: Optional[LeadIndex] = None,
+                               thread_state: Optional[ThreadStateStore] = None,
+                               deduplicator: Optional[LeadDeduplicator] = None) -> AsyncIterator[LeadRecord]:
+    """Async counterpart of iter_leads_adaptive over a pooled AsyncFirecrawlClient."""
+    while True:
+        batch_size = scheduler.next_batch_size()
+        if not batch_size:
+            break
+        if scheduler.needs_search(batch_size):
+            depth = scheduler.next_search_depth()
+            scheduler.add_search_results(await search_for_urls_async(company_description, client, depth), depth)
+        urls = scheduler.take(batch_size)
+        if not urls:
+            continue
+        extracted = []
+        async for info in aiter_user_info_from_urls(urls, client, max_concurrency, cache, thread_state, extracted):
+            for record in await aflatten_user_info(info, lead_index, deduplicator):
+                if scheduler.record_lead(record):
+                    yield record
+        scheduler.finish_batch(urls, extracted)
+    logger.info(f"Adaptive lead collection finished: {scheduler.summary()}")
+
+def write_to_google_sheets(flattened_data: List[dict], composio_api_key: str, spreadsheet_id: Optional[str] = None) -> str:
+    """Attempt to write data to Google Sheets (optional).
+
+    Rows are sent in batches straight to the Composio Sheets actions, so no LLM
+    round trip is needed. Pass ``spreadsheet_id`` to append to an existing sheet.
+    """
     logger.info(f"Attempting optional Google Sheets write operation for {len(flattened_data)} records")
     
     try:
-        google_sheets_agent = create_google_sheets_agent(composio_api_key, openai_api_key)
-        
-        message = (
-            "Create a new Google Sheet with this data. "
-            "The sheet should have these columns: Website URL, Username, Bio, Post Type, Timestamp, Upvotes, and Links in the same order as mentioned. "
-            "Here's the data in JSON format:\n\n"
-            f"{json.dumps(flattened_data)}"
-        )
-        
-        logger.info("Sending data to Google Sheets agent")
-        create_sheet_response = google_sheets_agent.run(message)
-        
-        if "https://docs.google.com/spreadsheets/d/" in create_sheet_response.content:
-            google_sheets_link = create_sheet_response.content.split("https://docs.google.com/spreadsheets/d/")[1].split(" ")[0]
-            sheet_url = f"https://docs.google.com/spreadsheets/d/{google_sheets_link}"
-            logger.info(f"Successfully created Google Sheet: {sheet_url}")
+        with stage("sheets_export", items_in=len(flattened_data)) as span:
+            from tools.sheets_writer import get_sheets_writer
+            writer = get_sheets_writer(composio_api_key)
+            sheet_url = writer.write(flattened_data, title="Leads", spreadsheet_id=spreadsheet_id, columns=LEAD_FIELDNAMES)
+            if sheet_url:
+                logger.info(f"Successfully wrote to Google Sheet: {sheet_url}")
+                span.items_out = len(flattened_data)
             return sheet_url
     except Exception as e:
         logger.warning(f"Google Sheets export failed (optional): {str(e)}")
         return None
-    
-    return None
 
 def create_prompt_transformation_agent(openai_api_key: str) -> Agent:
+    from agno.agent import Agent
+    from agno.models.openai import OpenAIChat
+
     logger.info("Creating prompt transformation agent")
     agent = Agent(
         model=OpenAIChat(id="gpt-4o-mini", api_key=openai_api_key),
@@ -230,18 +496,154 @@ Always focus on the core product/service and keep it concise but clear.""",
     logger.info("Prompt transformation agent created successfully")
     return agent
 
+@st.cache_resource
+def get_lead_index() -> LeadIndex:
+    """Process-wide index of leads surfaced by earlier runs."""
+    return LeadIndex()
+
+def get_prompt_transformation_agent(openai_api_key: str) -> Agent:
+    """Build the prompt transformation agent once per process."""
+    return shared(("prompt_transformation_agent", openai_api_key), lambda: create_prompt_transformation_agent(openai_api_key))
+
+@st.cache_resource
+def get_transform_cache() -> TransformCache:
+    """Process-wide on-disk cache of transformed queries, shared across Streamlit reruns."""
+    return TransformCache()
+
+def transform_user_query(user_query: str, openai_api_key: str, cache: Optional[TransformCache] = None) -> str:
+    """Turn a free-form user query into a concise company description, reusing cached transforms."""
+    if cache:
+        cached = cache.get(user_query)
+        if cached:
+            logger.info(f"Using cached transformed query: {cached}")
+            return cached
+    
+    transform_agent = get_prompt_transformation_agent(openai_api_key)
+    logger.info(f"Transforming user query: {user_query}")
+    with stage("transform", items_in=1) as span:
+        response = rate_limited_call(
+            "openai",
+            transform_agent.run,
+            f"Transform this query into a concise 3-4 word company description: {user_query}"
+        )
+        span.items_out = 1
+    company_description = response.content.strip()
+    logger.info(f"Transformed query: {company_description}")
+    if cache and company_description:
+        cache.set(user_query, company_description)
+    return company_description
+
+def run_lead_generation(user_query: str, target_leads: int, max_extracts: int, only_new_leads: bool,
+                        merge_duplicates: bool = True):
+    """Run one instrumented lead generation pass for the Streamlit page."""
+    with st.spinner("Processing your query..."):
+        company_description = transform_user_query(user_query, openai_api_key, get_transform_cache())
+        st.write("🎯 Searching for:", company_description)
+    
+    # Search, extract, flatten and write to CSV in yield-driven batches so leads show up as soon as each page finishes
+    scheduler = YieldScheduler(target_leads, max_extracts, batch_size=DEFAULT_MAX_WORKERS)
+    csv_file = make_csv_filename(company_description)
+    flattened_data = []
+    with st.spinner("Searching for URLs, extracting user info and writing leads to CSV..."):
+        extraction_status = st.empty()
+        leads_table = st.empty()
+        extract_cache = get_extract_cache()
+        # Leads are only marked as seen once the CSV holding them is complete
+        pending = PendingWrites()
+        records = iter_append_to_csv(
+            iter_leads_adaptive(
+                company_description, firecrawl_api_key, scheduler, cache=extract_cache,
+                lead_index=get_lead_index().deferred(pending) if only_new_leads else None,
+                thread_state=get_thread_state().deferred(pending) if only_new_leads else None,
+                deduplicator=make_lead_deduplicator() if merge_duplicates else None
+            ),
+            csv_file
+        )
+        shown = 0
+        last_refresh = 0.0
+        try:
+            for record in records:
+                flattened_data.append(record)
+                extraction_status.write(f"Found {len(flattened_data)}/{target_leads} leads "
+                                        f"(latest from {record['Website URL']}, {scheduler.extracts} pages extracted)")
+                if time.monotonic() - last_refresh >= TABLE_REFRESH_SECONDS:
+                    leads_table.dataframe(lead_columns(flattened_data))
+                    shown, last_refresh = len(flattened_data), time.monotonic()
+            if shown < len(flattened_data):
+                leads_table.dataframe(lead_columns(flattened_data))
+            pending.commit()
+        except Exception as e:
+            logger.error(f"Error writing to CSV: {str(e)}", exc_info=True)
+            csv_file = None
+        logger.info(f"Extract cache stats: {extract_cache.stats()}")
+    
+    if scheduler.extracted_urls:
+        st.subheader("Quora Links Used:")
+        for url in scheduler.extracted_urls:
+            st.write(url)
+        st.caption(f"Stopped after {scheduler.extracts} pages: {scheduler.stop_reason}")
+        
+        if csv_file:
+            logger.info("Lead generation process completed successfully")
+            st.success(f"Lead data has been saved to: {csv_file}")
+            
+            try:
+                with stage("dataset_write", items_in=len(flattened_data)):
+                    from tools.lead_dataset import write_leads_dataset
+                    write_leads_dataset(flattened_data, company_description)
+            except Exception as e:
+                logger.warning(f"Columnar dataset export failed: {str(e)}")
+            
+            # Attempt Google Sheets export (optional step)
+            with st.spinner("Attempting Google Sheets export (optional)..."):
+                google_sheets_link = write_to_google_sheets(flattened_data, composio_api_key)
+            
+            if google_sheets_link:
+                st.success("Additionally, data was exported to Google Sheets!")
+                st.subheader("Google Sheets Link:")
+                st.markdown(f"[View Google Sheet]({google_sheets_link})")
+            else:
+                st.info("Google Sheets export was not successful (optional step). Your data is still available in the CSV file.")
+        else:
+            logger.error("Failed to write data to CSV")
+            st.error("Failed to save the lead data.")
+    else:
+        logger.warning("No relevant URLs found")
+        st.warning("No relevant URLs found.")
+
 def main():
     st.title("🎯 AI Lead Generation Agent")
     st.info("This firecrawl powered agent helps you generate leads from Quora by searching for relevant posts and extracting user information.")
 
     logger.info("Starting lead generation application")
+    start_metrics_server()
     user_query = st.text_area(
         "Describe what kind of leads you're looking for:",
         placeholder="e.g., Looking for users who need automated video editing software with AI capabilities",
         help="Be specific about the product/service and target audience. The AI will convert this into a focused search query."
     )
     
-    num_links = 5
+    col1, col2 = st.columns(2)
+    with col1:
+        target_leads = st.number_input(
+            "Target number of leads", min_value=1, max_value=1000, value=DEFAULT_TARGET_LEADS,
+            help="Stop searching once this many unique leads have been found."
+        )
+    with col2:
+        max_extracts = st.number_input(
+            "Max pages to extract", min_value=1, max_value=MAX_SEARCH_DEPTH, value=DEFAULT_MAX_EXTRACTS,
+            help="Cost budget: the most Quora pages extracted for this run."
+        )
+    only_new_leads = st.checkbox(
+        "Only show new leads",
+        value=True,
+        help="Skip leads (same username, URL and bio) that earlier runs already surfaced, and only re-extract threads that changed since they were last crawled."
+    )
+    merge_duplicates = st.checkbox(
+        "Merge near-duplicate leads",
+        value=True,
+        help="Collapse the same person appearing under different handles or with a copy-pasted bio into one lead."
+    )
 
     if st.button("Generate Leads"):
         logger.info(f"Lead generation started with query: {user_query}")
@@ -249,51 +651,11 @@ def main():
             logger.error("Missing required API keys or user query")
             st.error("Please fill in all the API keys and describe what leads you're looking for.")
         else:
-            with st.spinner("Processing your query..."):
-                transform_agent = create_prompt_transformation_agent(openai_api_key)
-                logger.info(f"Transforming user query: {user_query}")
-                company_description = transform_agent.run(f"Transform this query into a concise 3-4 word company description: {user_query}")
-                logger.info(f"Transformed query: {company_description.content}")
-                st.write("🎯 Searching for:", company_description.content)
-            
-            with st.spinner("Searching for relevant URLs..."):
-                urls = search_for_urls(company_description.content, firecrawl_api_key, num_links)
-            
-            if urls:
-                st.subheader("Quora Links Used:")
-                for url in urls:
-                    st.write(url)
-                
-                with st.spinner("Extracting user info from URLs..."):
-                    user_info_list = extract_user_info_from_urls(urls, firecrawl_api_key)
-                
-                with st.spinner("Formatting user info..."):
-                    flattened_data = format_user_info_to_flattened_json(user_info_list)
-                
-                # First, write to CSV (required step)
-                with st.spinner("Writing to CSV..."):
-                    csv_file = write_to_csv(flattened_data, company_description.content)
-                
-                if csv_file:
-                    logger.info("Lead generation process completed successfully")
-                    st.success(f"Lead data has been saved to: {csv_file}")
-                    
-                    # Attempt Google Sheets export (optional step)
-                    with st.spinner("Attempting Google Sheets export (optional)..."):
-                        google_sheets_link = write_to_google_sheets(flattened_data, composio_api_key, openai_api_key)
-                    
-                    if google_sheets_link:
-                        st.success("Additionally, data was exported to Google Sheets!")
-                        st.subheader("Google Sheets Link:")
-                        st.markdown(f"[View Google Sheet]({google_sheets_link})")
-                    else:
-                        st.info("Google Sheets export was not successful (optional step). Your data is still available in the CSV file.")
-                else:
-                    logger.error("Failed to write data to CSV")
-                    st.error("Failed to save the lead data.")
-            else:
-                logger.warning("No relevant URLs found")
-                st.warning("No relevant URLs found.")
+            with run_report("lead_generation_agent") as report:
+                run_lead_generation(user_query, int(target_leads), int(max_extracts), only_new_leads, merge_duplicates)
+            report.write_json()
+            with st.expander("Run report"):
+                st.json(report.to_dict())
 
     logger.info("Application execution completed")
 
@@ -1,15 +1,23 @@
 # app.py
+# Heavy dependencies (pandas, plotly, crewai, pyarrow) are imported inside the
+# functions that need them: Streamlit re-runs this script on every interaction,
+# and widget-only reruns shouldn't pay for loading the LLM stack.
+from __future__ import annotations
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
-from crewai import Crew, Process
-from tasks.tasks import LeadGenTasks
+from tools.run_metrics import run_report, stage, start_metrics_server
 import os
 from dotenv import load_dotenv
 import logging
 from datetime import datetime
 import json
+import time
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from crewai import Crew
+    from tools.lead_aggregates import AggregateCache, LeadAggregates
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -32,10 +40,12 @@ def load_environment():
         )
 
 def create_crew(target_description: str) -> Crew:
+    """Crew for the research phase. Analysis and export run afterwards over token-budgeted chunks."""
+    from crewai import Crew, Process
+    from tasks.tasks import LeadGenTasks
+
     tasks = [
-        LeadGenTasks.research_task(target_description),
-        LeadGenTasks.analyze_task(),
-        LeadGenTasks.document_task()
+        LeadGenTasks.research_task(target_description)
     ]
     return Crew(
         tasks=tasks,
@@ -44,31 +54,115 @@ def create_crew(target_description: str) -> Crew:
         process=Process.sequential
     )
 
-def display_lead_metrics(df: pd.DataFrame):
-    """Display key metrics and visualizations for the leads data"""
+def search_leads_directly(target_description: str) -> List[dict]:
+    """Non-LLM fallback for research: map structured search results straight onto the lead schema."""
+    from tools.fanout_search import fan_out_search
+    from tools.search_results import result_from_dict, results_to_leads
+
+    logger.warning("Research output was not a JSON list of leads; falling back to structured search results")
+    results = fan_out_search(target_description, os.getenv("FIRECRAWL_API_KEY"), top_k=25,
+                             exa_api_key=os.getenv("EXA_API_KEY"), exa_domains=None)
+    if not results:
+        raise ValueError("The research phase did not return a JSON list of leads")
+    return [dict(lead) for lead in results_to_leads(result_from_dict(result) for result in results)]
+
+def analyze_leads(leads: List[dict]) -> List[dict]:
+    """Score every lead deterministically, then have the analyzer review only the borderline ones.
+
+    The ``DEFAULT_REVIEW_COUNT`` leads closest to a priority threshold go to
+    the LLM in token-budgeted chunks, concurrently; every other lead keeps its
+    deterministic score, so LLM cost doesn't grow with the number of leads.
+    """
+    import pandas as pd
+    from crewai import Crew, Process
+    from tasks.tasks import LeadGenTasks
+    from tools.lead_scoring import DEFAULT_REVIEW_COUNT, score_leads, select_borderline
+    from tools.llm_batching import parse_json_array, run_in_chunks
+
+    if not leads:
+        return []
+
+    def analyze_chunk(chunk: List[dict]) -> Optional[list]:
+        crew = Crew(
+            tasks=[LeadGenTasks.analyze_task(json.dumps(chunk, default=str))],
+            verbose=True,
+            max_rpm=50,
+            process=Process.sequential
+        )
+        return parse_json_array(crew.kickoff())
+
+    scored = score_leads(pd.DataFrame(leads))
+    records = scored.to_dict("records")
+    # score_leads keeps the RangeIndex of the frame, so index labels are positions in records
+    borderline = list(select_borderline(scored, DEFAULT_REVIEW_COUNT))
+    reviewed = run_in_chunks([records[i] for i in borderline], analyze_chunk, "analyze")
+    for i, record in zip(borderline, reviewed):
+        records[i] = record
+    return records
+
+def export_leads(leads: List[dict], target_description: str) -> dict:
+    """Write the CSV (required) and Google Sheet (optional) directly, in batches, without an LLM round trip."""
+    from tools.csv_tools import write_leads_csv
+    from tools.sheets_writer import get_sheets_writer
+
+    with stage("csv_write", items_in=len(leads)) as span:
+        csv_file = write_leads_csv(leads, target_description)
+        span.items_out = len(leads)
+
+    sheet_url = None
+    try:
+        with stage("sheets_export", items_in=len(leads)) as span:
+            sheet_url = get_sheets_writer().write(leads, title="Leads")
+            span.items_out = len(leads) if sheet_url else 0
+    except Exception as e:
+        logger.warning(f"Google Sheets export failed (optional): {str(e)}")
+
+    return {
+        "csv_file": csv_file,
+        "google_sheet_url": sheet_url,
+        "total_leads": len(leads),
+        "status": "Success" if sheet_url else "CSV written; Google Sheets export skipped"
+    }
+
+@st.cache_resource
+def get_aggregate_cache() -> AggregateCache:
+    """Dashboard aggregates shared by every session, refreshed only when a leads file changes."""
+    from tools.lead_aggregates import AggregateCache
+    return AggregateCache()
+
+@st.cache_data(max_entries=8)
+def load_leads_frame(path: str, mtime_ns: int) -> pd.DataFrame:
+    """Read and type a leads CSV once per file version (``mtime_ns`` keys the cache)."""
+    import pandas as pd
+    from tools.lead_aggregates import prepare_leads
+    return prepare_leads(pd.read_csv(path))
+
+def display_lead_metrics(aggregates: LeadAggregates):
+    """Display key metrics and visualizations from precomputed lead aggregates"""
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from tools.lead_aggregates import SCORE_BINS
+
     st.subheader("📊 Lead Analysis Dashboard")
     
     # Key Metrics in columns
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Total Leads", len(df))
+        st.metric("Total Leads", aggregates.total)
     with col2:
-        avg_score = df['Qualification Score'].mean() if 'Qualification Score' in df.columns else 0
-        st.metric("Avg Qualification Score", f"{avg_score:.1f}")
+        st.metric("Avg Qualification Score", f"{aggregates.avg_score:.1f}")
     with col3:
-        high_priority = len(df[df['Priority'] == 'High']) if 'Priority' in df.columns else 0
-        st.metric("High Priority Leads", high_priority)
+        st.metric("High Priority Leads", int(aggregates.priority_counts['High']))
     with col4:
-        platforms = len(df['Platform'].unique()) if 'Platform' in df.columns else 0
-        st.metric("Source Platforms", platforms)
+        st.metric("Source Platforms", len(aggregates.platform_counts))
 
     # Create two columns for charts
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("Lead Sources Distribution")
-        if 'Platform' in df.columns:
-            platform_counts = df['Platform'].value_counts()
+        if aggregates.has('Platform'):
+            platform_counts = aggregates.platform_counts
             fig = px.pie(values=platform_counts.values, 
                         names=platform_counts.index,
                         title="Leads by Platform")
@@ -76,17 +170,16 @@ def display_lead_metrics(df: pd.DataFrame):
 
     with col2:
         st.subheader("Qualification Score Distribution")
-        if 'Qualification Score' in df.columns:
-            fig = px.histogram(df, x='Qualification Score',
-                             title="Distribution of Qualification Scores",
-                             nbins=10)
+        if aggregates.has('Qualification Score'):
+            fig = px.bar(x=SCORE_BINS, y=aggregates.score_histogram,
+                         labels={'x': 'Qualification Score', 'y': 'count'},
+                         title="Distribution of Qualification Scores")
             st.plotly_chart(fig, use_container_width=True)
 
     # Priority Distribution
-    if 'Priority' in df.columns:
+    if aggregates.has('Priority'):
         st.subheader("Lead Priority Distribution")
-        priority_order = ['High', 'Medium', 'Low']
-        priority_counts = df['Priority'].value_counts().reindex(priority_order)
+        priority_counts = aggregates.priority_counts
         fig = go.Figure(data=[
             go.Bar(x=priority_counts.index, 
                   y=priority_counts.values,
@@ -96,12 +189,9 @@ def display_lead_metrics(df: pd.DataFrame):
         st.plotly_chart(fig, use_container_width=True)
 
     # Top Leads Table
-    if 'Qualification Score' in df.columns:
+    if aggregates.has('Qualification Score'):
         st.subheader("🌟 Top Qualified Leads")
-        top_leads = df.nlargest(5, 'Qualification Score')[
-            ['Username', 'Platform', 'Qualification Score', 'Priority', 'Notes']
-        ]
-        st.dataframe(top_leads, use_container_width=True)
+        st.dataframe(aggregates.top_leads, use_container_width=True)
 
 def display_process_status(phase: str, status: str):
     """Display the current process status"""
@@ -125,6 +215,126 @@ def display_process_status(phase: str, status: str):
         else:
             st.sidebar.write(f"{phase}: {state}")
 
+PHASES = ["Research", "Analysis", "Documentation"]
+
+# Seconds between job status polls while a job is queued or running
+POLL_SECONDS = 2
+
+def run_crew_job(payload: dict, progress) -> dict:
+    """Job handler: run research, chunked analysis and export in a worker process, reporting per-phase progress."""
+    from tools.lead_dataset import write_leads_dataset
+    from tools.llm_batching import parse_json_array
+
+    target_description = payload["target_description"]
+
+    with run_report("crew_app") as report:
+        progress(PHASES[0], 0.0)
+        crew = create_crew(target_description)
+        with stage("crew_kickoff") as span:
+            research_output = crew.kickoff()
+            usage = getattr(crew, "usage_metrics", None)
+            span.tokens = getattr(usage, "total_tokens", 0) if usage else 0
+
+        leads = parse_json_array(research_output)
+        if leads is None:
+            leads = search_leads_directly(target_description)
+        leads = [dict(lead) for lead in leads if isinstance(lead, Mapping)]
+
+        # Collapse the same person found under several handles before paying for analysis
+        from tools.lead_clustering import LeadDeduplicator
+        with stage("dedup", items_in=len(leads)) as span:
+            leads = LeadDeduplicator().merge(leads)
+            span.items_out = len(leads)
+
+        progress(PHASES[1], 1 / len(PHASES))
+        leads = analyze_leads(leads)
+
+        progress(PHASES[2], 2 / len(PHASES))
+        parsed = export_leads(leads, target_description)
+
+        try:
+            with stage("dataset_write", items_in=len(leads)):
+                write_leads_dataset(leads, target_description)
+        except Exception as e:
+            logger.warning(f"Columnar dataset export failed: {str(e)}")
+    report.write_json()
+    return {"results": parsed, "report": report.to_dict()}
+
+@st.cache_resource
+def get_job_queue():
+    """Job queue shared by every session, with its worker pool started once per server."""
+    from tools.job_queue import JobQueue, WorkerPool
+    from tools.registry import shared
+    queue = JobQueue()
+    # The pool lives outside the resource cache: rebuilding this entry (e.g. "Clear cache") must not start more workers
+    shared(("job_worker_pool", queue.path), lambda: WorkerPool(queue.path).start())
+    return queue
+
+def display_results(results):
+    """Display the files and dashboard for a finished crew run"""
+    st.success("Lead generation completed successfully!")
+
+    # Display file locations
+    st.subheader("📁 Generated Files")
+    if isinstance(results, dict):
+        if 'csv_file' in results:
+            st.write(f"📊 CSV File: `{results['csv_file']}`")
+        if results.get('google_sheet_url'):
+            st.write(f"📈 Google Sheet: [{results['google_sheet_url']}]({results['google_sheet_url']})")
+
+        # Load and display data if CSV file exists
+        if 'csv_file' in results and os.path.exists(results['csv_file']):
+            # Aggregates are cached per file version, so reruns (e.g. toggling raw data) don't recompute them
+            display_lead_metrics(get_aggregate_cache().for_csv(results['csv_file']))
+
+            # Raw Data Option
+            if st.checkbox("Show Raw Data"):
+                st.subheader("Raw Lead Data")
+                st.dataframe(load_leads_frame(results['csv_file'], os.stat(results['csv_file']).st_mtime_ns))
+    else:
+        st.write("Results:", results)
+
+def display_job(job_id: str):
+    """Show the status of a submitted job, polling until it finishes"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        st.warning(f"Job {job_id} was not found.")
+        return
+
+    st.caption(f"Job `{job.id}`")
+    st.progress(int(job.progress * 100))
+    completed_phases = int(job.progress * len(PHASES))
+    for index, phase in enumerate(PHASES):
+        if index < completed_phases:
+            display_process_status(phase, "✅ Completed")
+        elif index == completed_phases and job.status == "failed":
+            display_process_status(phase, "❌ Error")
+        elif index == completed_phases and job.status == "running":
+            display_process_status(phase, "⚡ Processing")
+        else:
+            display_process_status(phase, "⏳ Pending")
+
+    if job.status == "queued":
+        st.info("⏳ Waiting for a free worker...")
+    elif job.status == "running":
+        st.info(f"🔍 {job.phase}...")
+    elif job.status == "failed":
+        error = job.error.splitlines()[0] if job.error else "unknown error"
+        st.error(f"An error occurred: {error}")
+        return
+    else:
+        try:
+            display_results(job.result["results"])
+        except Exception as e:
+            st.error(f"Error processing results: {str(e)}")
+            logger.error(f"Error processing results: {str(e)}", exc_info=True)
+        with st.expander("Run report"):
+            st.json(job.result.get("report", {}))
+        return
+
+    time.sleep(POLL_SECONDS)
+    st.rerun()
+
 def main():
     st.set_page_config(page_title="AI Lead Generation Agent", layout="wide")
     
@@ -140,6 +350,7 @@ def main():
     except EnvironmentError as e:
         st.error(str(e))
         return
+    start_metrics_server()
 
     # Main input
     target_description = st.text_area(
@@ -148,68 +359,27 @@ def main():
         help="Be specific about the product/service and target audience."
     )
 
+    if st.sidebar.checkbox("Show historical leads dashboard"):
+        from tools.lead_dataset import DEFAULT_DATASET_DIR
+        history = get_aggregate_cache().for_dataset(DEFAULT_DATASET_DIR)
+        if history.total:
+            display_lead_metrics(history)
+        else:
+            st.sidebar.info("No historical leads yet.")
+
     if st.button("Generate Leads"):
         if not target_description:
             st.error("Please describe your target leads.")
             return
 
-        # Create progress tracking
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        try:
-            # Initialize crew
-            crew = create_crew(target_description)
-            
-            # Update status for research phase
-            status_text.text("🔍 Phase 1/3: Researching potential leads...")
-            display_process_status("Research", "⚡ Processing")
-            
-            # Execute the crew
-            results = crew.kickoff()
-            
-            # Update final status
-            progress_bar.progress(100)
-            display_process_status("Research", "✅ Completed")
-            display_process_status("Analysis", "✅ Completed")
-            display_process_status("Documentation", "✅ Completed")
-            status_text.text("✨ Process completed successfully!")
-            
-            try:
-                # Parse results and display
-                if isinstance(results, str):
-                    results = json.loads(results)
-                
-                st.success("Lead generation completed successfully!")
-                
-                # Display file locations
-                st.subheader("📁 Generated Files")
-                if isinstance(results, dict):
-                    if 'csv_file' in results:
-                        st.write(f"📊 CSV File: `{results['csv_file']}`")
-                    if 'google_sheet_url' in results:
-                        st.write(f"📈 Google Sheet: [{results['google_sheet_url']}]({results['google_sheet_url']})")
-                    
-                    # Load and display data if CSV file exists
-                    if 'csv_file' in results and os.path.exists(results['csv_file']):
-                        df = pd.read_csv(results['csv_file'])
-                        display_lead_metrics(df)
-                        
-                        # Raw Data Option
-                        if st.checkbox("Show Raw Data"):
-                            st.subheader("Raw Lead Data")
-                            st.dataframe(df)
-                else:
-                    st.write("Results:", results)
-                
-            except Exception as e:
-                st.error(f"Error processing results: {str(e)}")
-                logger.error(f"Error processing results: {str(e)}", exc_info=True)
+        job_id = get_job_queue().submit("crew_leads", {"target_description": target_description})
+        st.session_state.job_id = job_id
+        # Keep the job id in the URL so a reconnecting tab picks the run back up
+        st.query_params["job"] = job_id
 
-        except Exception as e:
-            status_text.text("❌ Process failed!")
-            st.error(f"An error occurred: {str(e)}")
-            logger.error(f"Process failed: {str(e)}", exc_info=True)
+    job_id = st.session_state.get("job_id") or st.query_params.get("job")
+    if job_id:
+        display_job(job_id)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
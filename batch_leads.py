@@ -0,0 +1,254 @@
+# batch_leads.py
+"""Headless batch runner for lead sweeps.
+
+Reads target descriptions from a JSONL file (one object with a ``query`` or
+``target_description`` field per line) or a CSV file with either column, runs
+the search -> extract -> flatten pipeline for many queries in parallel and
+writes one consolidated CSV.
+Each finished query is checkpointed so a crashed sweep can be resumed without
+redoing completed work.
+
+    python batch_leads.py niches.jsonl --output sweep.csv --parallel 4
+
+With ``--async-io`` every query runs on one event loop sharing a pooled HTTP/2
+Firecrawl client, so large sweeps don't need a thread per request.
+With ``--target-leads`` each query searches deeper and extracts more pages only
+while they keep yielding new leads, up to ``--max-extracts`` pages.
+"""
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
+import logging
+
+from ai_lead_generation_agent import (
+    DEFAULT_MAX_WORKERS,
+    LEAD_FIELDNAMES,
+    aiter_leads_adaptive,
+    aflatten_user_info,
+    aiter_user_info_from_urls,
+    firecrawl_api_key,
+    get_extract_cache,
+    get_lead_index,
+    get_thread_state,
+    get_transform_cache,
+    iter_flattened_records,
+    iter_leads_adaptive,
+    iter_user_info_from_urls,
+    make_lead_deduplicator,
+    openai_api_key,
+    search_for_urls,
+    search_for_urls_async,
+    transform_user_query,
+)
+from tools.lead_scheduler import DEFAULT_MAX_EXTRACTS, YieldScheduler
+from tools.pending_writes import PendingWrites
+from tools.run_metrics import run_report
+
+logger = logging.getLogger(__name__)
+
+def load_queries(path: str) -> List[str]:
+    """Read target descriptions from a JSONL or CSV file, skipping blanks and duplicates."""
+    queries = []
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(f):
+                queries.append(row.get("query") or row.get("target_description", ""))
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    item = json.loads(line)
+                    queries.append(item if isinstance(item, str) else item.get("query") or item.get("target_description", ""))
+    seen = set()
+    unique = []
+    for query in (q.strip() for q in queries):
+        if query and query not in seen:
+            seen.add(query)
+            unique.append(query)
+    return unique
+
+def checkpoint_path(checkpoint_dir: str, query: str) -> str:
+    digest = hashlib.sha256(query.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(checkpoint_dir, f"{digest}.jsonl")
+
+def run_query(query: str, checkpoint_dir: str, num_links: int, max_workers: int, transform: bool,
+              only_new: bool = False, target_leads: Optional[int] = None,
+              max_extracts: int = DEFAULT_MAX_EXTRACTS, merge_duplicates: bool = False) -> int:
+    """Run the pipeline for one query and checkpoint its records. Returns the record count."""
+    done_path = checkpoint_path(checkpoint_dir, query)
+    if os.path.exists(done_path):
+        logger.info(f"Skipping already completed query: {query}")
+        with open(done_path, encoding='utf-8') as f:
+            return sum(1 for _ in f)
+
+    with run_report("batch_query") as report:
+        company_description = transform_user_query(query, openai_api_key, get_transform_cache()) if transform else query
+        # Leads are only marked as seen once the checkpoint holding them is committed, so a resumed query re-emits them
+        pending = PendingWrites()
+        lead_index = get_lead_index().deferred(pending) if only_new else None
+        thread_state = get_thread_state().deferred(pending) if only_new else None
+        deduplicator = make_lead_deduplicator() if merge_duplicates else None
+        if target_leads:
+            scheduler = YieldScheduler(target_leads, max_extracts, batch_size=max_workers)
+            records = iter_leads_adaptive(company_description, firecrawl_api_key, scheduler, max_workers,
+                                          get_extract_cache(), lead_index, thread_state, deduplicator)
+        else:
+            urls = search_for_urls(company_description, firecrawl_api_key, num_links)
+            user_info_iter = iter_user_info_from_urls(urls, firecrawl_api_key, max_workers, get_extract_cache(), thread_state)
+            records = iter_flattened_records(user_info_iter, lead_index, deduplicator)
+
+        # Write to a partial file and rename once complete so a crash never leaves a half-done checkpoint
+        partial_path = done_path + ".partial"
+        count = 0
+        with open(partial_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps({"Query": query, **record}) + "\n")
+                count += 1
+        os.replace(partial_path, done_path)
+        pending.commit()
+    report.write_json()
+    logger.info(f"Completed query '{query}' with {count} records")
+    return count
+
+async def run_query_async(query: str, client, checkpoint_dir: str, num_links: int, max_concurrency: int,
+                          transform: bool, only_new: bool = False, target_leads: Optional[int] = None,
+                          max_extracts: int = DEFAULT_MAX_EXTRACTS, merge_duplicates: bool = False) -> int:
+    """Async counterpart of run_query using a shared AsyncFirecrawlClient.
+
+    SQLite and embedding work runs in threads so one query's bookkeeping never stalls the others' requests.
+    """
+    done_path = checkpoint_path(checkpoint_dir, query)
+    if os.path.exists(done_path):
+        logger.info(f"Skipping already completed query: {query}")
+        with open(done_path, encoding='utf-8') as f:
+            return sum(1 for _ in f)
+
+    with run_report("batch_query") as report:
+        if transform:
+            # The LLM agent is synchronous; keep it off the event loop
+            company_description = await asyncio.to_thread(transform_user_query, query, openai_api_key, get_transform_cache())
+        else:
+            company_description = query
+        # Leads are only marked as seen once the checkpoint holding them is committed, so a resumed query re-emits them
+        pending = PendingWrites()
+        lead_index = get_lead_index().deferred(pending) if only_new else None
+        thread_state = get_thread_state().deferred(pending) if only_new else None
+        deduplicator = make_lead_deduplicator() if merge_duplicates else None
+
+        partial_path = done_path + ".partial"
+        count = 0
+        with open(partial_path, 'w', encoding='utf-8') as f:
+            if target_leads:
+                scheduler = YieldScheduler(target_leads, max_extracts, batch_size=max_concurrency)
+                async for record in aiter_leads_adaptive(company_description, client, scheduler, max_concurrency,
+                                                         get_extract_cache(), lead_index, thread_state, deduplicator):
+                    f.write(json.dumps({"Query": query, **record}) + "\n")
+                    count += 1
+            else:
+                urls = await search_for_urls_async(company_description, client, num_links)
+                async for info in aiter_user_info_from_urls(urls, client, max_concurrency, get_extract_cache(), thread_state):
+                    for record in await aflatten_user_info(info, lead_index, deduplicator):
+                        f.write(json.dumps({"Query": query, **record}) + "\n")
+                        count += 1
+        os.replace(partial_path, done_path)
+        await asyncio.to_thread(pending.commit)
+    report.write_json()
+    logger.info(f"Completed query '{query}' with {count} records")
+    return count
+
+async def run_queries_async(queries: List[str], args: argparse.Namespace) -> List[str]:
+    """Run every query on one event loop, ``args.parallel`` at a time. Returns the failed queries."""
+    from tools.async_clients import AsyncFirecrawlClient
+
+    failed = []
+    semaphore = asyncio.Semaphore(max(1, args.parallel))
+    async with AsyncFirecrawlClient(firecrawl_api_key) as client:
+        async def run_one(query: str) -> None:
+            async with semaphore:
+                try:
+                    await run_query_async(query, client, args.checkpoint_dir, args.num_links, args.max_workers,
+                                          args.transform, args.only_new, args.target_leads, args.max_extracts,
+                                          args.merge_duplicates)
+                except Exception as e:
+                    logger.error(f"Query failed: {query}: {str(e)}", exc_info=True)
+                    failed.append(query)
+
+        await asyncio.gather(*(run_one(query) for query in queries))
+    return failed
+
+def write_consolidated_csv(queries: List[str], checkpoint_dir: str, output: str) -> int:
+    """Merge the per-query checkpoints into one CSV in input order."""
+    total = 0
+    with open(output, 'w', newline='', encoding='utf-8') as out:
+        writer = csv.DictWriter(out, fieldnames=["Query"] + LEAD_FIELDNAMES, extrasaction='ignore')
+        writer.writeheader()
+        for query in queries:
+            path = checkpoint_path(checkpoint_dir, query)
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    writer.writerow(json.loads(line))
+                    total += 1
+    return total
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run lead generation for many target descriptions")
+    parser.add_argument("input", help="JSONL or CSV file of target descriptions")
+    parser.add_argument("--output", default="lead_generation_output/batch_leads.csv", help="Consolidated CSV output path")
+    parser.add_argument("--checkpoint-dir", default="lead_generation_output/batch_checkpoints", help="Directory for per-query checkpoints")
+    parser.add_argument("--parallel", type=int, default=4, help="Number of queries to run at once")
+    parser.add_argument("--num-links", type=int, default=5, help="Number of URLs to search per query")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Concurrent extracts per query")
+    parser.add_argument("--transform", action="store_true", help="Condense each query with the prompt transformation agent first")
+    parser.add_argument("--only-new", action="store_true", help="Skip leads already surfaced by earlier runs and only re-extract threads that changed")
+    parser.add_argument("--target-leads", type=int, help="Search and extract adaptively until this many leads are found, instead of a fixed --num-links")
+    parser.add_argument("--max-extracts", type=int, default=DEFAULT_MAX_EXTRACTS, help="Most pages to extract per query with --target-leads")
+    parser.add_argument("--merge-duplicates", action="store_true", help="Merge near-duplicate leads (same person, different handle or copied bio)")
+    parser.add_argument("--async-io", action="store_true", help="Run all queries on one event loop with pooled async HTTP clients")
+    args = parser.parse_args(argv)
+
+    if not firecrawl_api_key or (args.transform and not openai_api_key):
+        logger.error("Missing required API keys")
+        return 1
+
+    queries = load_queries(args.input)
+    logger.info(f"Loaded {len(queries)} queries from {args.input}")
+    os.makedirs(args.checkpoint_dir, exist_ok=True)
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    failed = []
+    if args.async_io:
+        failed = asyncio.run(run_queries_async(queries, args))
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, args.parallel)) as executor:
+            futures = {
+                executor.submit(run_query, query, args.checkpoint_dir, args.num_links, args.max_workers, args.transform, args.only_new,
+                                args.target_leads, args.max_extracts, args.merge_duplicates): query
+                for query in queries
+            }
+            for future in as_completed(futures):
+                query = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Query failed: {query}: {str(e)}", exc_info=True)
+                    failed.append(query)
+
+    total = write_consolidated_csv(queries, args.checkpoint_dir, args.output)
+    logger.info(f"Wrote {total} records from {len(queries) - len(failed)} queries to {args.output}")
+    if failed:
+        logger.warning(f"{len(failed)} queries failed and will be retried on the next run")
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,393 @@
+# benchmarks/pipeline_benchmark.py
+"""Offline throughput/latency benchmark for the lead pipeline stages.
+
+Starts a local stub server that replays the recorded Firecrawl search/extract
+and Exa responses in ``benchmarks/fixtures`` (scaled up to the requested lead
+count), points the clients at it through FIRECRAWL_API_URL / EXA_API_URL and
+times each stage at 10, 1k and 100k leads:
+
+    search      search_for_urls (query fan-out + Exa)
+    extract     extract_user_info_from_urls (thread pool, firecrawl-py)
+    extract_async  aiter_user_info_from_urls (asyncio client)
+    flatten     format_user_info_to_flattened_json
+    csv         write_to_csv
+    sheets      GoogleSheetsWriter replaying the recorded Composio responses (needs composio)
+    dashboard   lead aggregates built from a scored CSV + app.display_lead_metrics (Streamlit in bare mode)
+
+Rate limits are lifted so the numbers measure this code rather than the
+provider quotas. Results are written as JSON and can be compared against an
+earlier run:
+
+    python benchmarks/pipeline_benchmark.py --json before.json
+    python benchmarks/pipeline_benchmark.py --json after.json --compare before.json
+    python benchmarks/pipeline_benchmark.py --sizes 10,1000 --stages flatten,csv --latency-ms 50
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+DEFAULT_SIZES = [10, 1000, 100000]
+STAGES = ["search", "extract", "extract_async", "flatten", "csv", "sheets", "dashboard"]
+
+# Run report span recorded by each benchmarked stage, used for per-call latency
+STAGE_SPANS = {
+    "search": "search",
+    "extract": "extract",
+    "extract_async": "extract",
+    "flatten": "flatten",
+    "csv": "csv_write",
+    "sheets": None,
+    "dashboard": None,
+}
+
+def load_fixture(name: str) -> dict:
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return json.load(f)
+
+class StubAPI:
+    """Replays recorded API responses, synthesizing as many results and interactions as requested."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000.0
+        self.search_results = load_fixture("firecrawl_search.json")["data"]
+        self.extract_response = load_fixture("firecrawl_extract.json")
+        self.exa_response = load_fixture("exa_search.json")
+        self.interactions_per_page = len(self.extract_response["data"]["interactions"])
+        self._jobs: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def search(self, limit: int) -> dict:
+        results = []
+        for i in range(limit):
+            if i < len(self.search_results):
+                results.append(self.search_results[i])
+            else:
+                template = self.search_results[i % len(self.search_results)]
+                results.append({**template, "url": f"https://www.quora.com/Benchmark-thread-{i}"})
+        return {"success": True, "data": results}
+
+    def exa_search(self, num_results: int) -> dict:
+        results = list(self.exa_response["results"][:num_results])
+        for i in range(len(results), num_results):
+            results.append({**results[0], "id": str(i), "url": f"https://www.quora.com/Benchmark-thread-{i}"})
+        return {**self.exa_response, "results": results}
+
+    def start_extract(self, urls: List[str]) -> dict:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = urls[0] if urls else ""
+        return {"success": True, "id": job_id}
+
+    def extract_status(self, job_id: str) -> dict:
+        with self._lock:
+            url = self._jobs.pop(job_id, "")
+        recorded = self.extract_response["data"]["interactions"]
+        page = abs(hash(url)) % 100000
+        interactions = []
+        for j in range(self.interactions_per_page):
+            interaction = dict(recorded[j % len(recorded)])
+            if j >= len(recorded):
+                interaction["username"] = f"{interaction['username']} {page}-{j}"
+            interactions.append(interaction)
+        return {**self.extract_response, "data": {"interactions": interactions}}
+
+def make_handler(api: StubAPI):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; without TCP_NODELAY keep-alive clients stall on delayed ACKs
+        disable_nagle_algorithm = True
+
+        def _send(self, payload: dict, status: int = 200) -> None:
+            if api.latency:
+                time.sleep(api.latency)
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def do_POST(self):
+            body = self._body()
+            if self.path == "/v1/search":
+                self._send(api.search(int(body.get("limit", 5))))
+            elif self.path == "/v1/extract":
+                self._send(api.start_extract(body.get("urls") or []))
+            elif self.path == "/search":
+                self._send(api.exa_search(int(body.get("numResults") or 10)))
+            else:
+                self._send({"success": False, "error": f"unknown endpoint {self.path}"}, 404)
+
+        def do_GET(self):
+            if self.path.startswith("/v1/extract/"):
+                self._send(api.extract_status(self.path.rsplit("/", 1)[-1]))
+            else:
+                self._send({"success": False, "error": f"unknown endpoint {self.path}"}, 404)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 resets connections under the async stage's concurrency
+    request_queue_size = 256
+
+def start_stub_server(api: StubAPI) -> ThreadingHTTPServer:
+    server = StubServer(("127.0.0.1", 0), make_handler(api))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+class ReplayToolset:
+    """Stands in for ComposioToolSet, answering execute_action with the recorded responses."""
+
+    def __init__(self):
+        self.responses = {
+            "GOOGLESHEETS_SHEET_FROM_JSON": load_fixture("composio_sheet_from_json.json"),
+            "GOOGLESHEETS_BATCH_UPDATE": load_fixture("composio_batch_update.json"),
+        }
+
+    def execute_action(self, action, params: dict) -> dict:
+        name = getattr(action, "name", None) or str(action).rsplit(".", 1)[-1]
+        return self.responses[name]
+
+def configure_environment(base_url: str) -> None:
+    """Point every client at the stub server and lift rate limits before the pipeline modules are imported."""
+    os.environ["FIRECRAWL_API_URL"] = base_url
+    os.environ["EXA_API_URL"] = base_url
+    for provider in ("FIRECRAWL", "EXA", "COMPOSIO", "OPENAI"):
+        os.environ[f"{provider}_API_KEY"] = "benchmark"
+        os.environ[f"{provider}_RPM"] = "100000000"
+    os.environ.pop("LEAD_METRICS_PORT", None)
+
+def quiet_logging() -> None:
+    """Silence the per-lead INFO logs and Streamlit's bare-mode warnings so they don't skew or bury the timings.
+
+    Streamlit re-applies its own logger levels when its config loads, so this
+    disables logging globally rather than per logger.
+    """
+    logging.disable(logging.WARNING)
+
+def measure(fn: Callable, span_name: Optional[str]) -> Tuple[float, object, dict]:
+    """Run ``fn`` once under a run report; return (seconds, result, per-call stats for ``span_name``)."""
+    from tools.run_metrics import run_report
+
+    with run_report("benchmark") as report:
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+    stats = report.to_dict()["stages"].get(span_name, {}) if span_name else {}
+    return elapsed, result, stats
+
+def run_size(n: int, stages: List[str], api: StubAPI, args: argparse.Namespace) -> List[dict]:
+    """Benchmark the selected stages for ``n`` leads; each stage feeds the next."""
+    import pandas as pd
+    import ai_lead_generation_agent as pipeline
+    from tools import registry
+    from tools.lead_scoring import score_leads
+
+    per_page = min(n, args.leads_per_page)
+    pages = math.ceil(n / per_page)
+    api.interactions_per_page = per_page
+    description = "AI video editing software"
+
+    def search():
+        # Fresh clients each time so the search cache doesn't turn repeats into hits
+        registry.clear()
+        return pipeline.search_for_urls(description, pipeline.firecrawl_api_key, pages)
+
+    def extract():
+        return pipeline.extract_user_info_from_urls(urls, pipeline.firecrawl_api_key, args.max_workers, cache=None)
+
+    def extract_async():
+        from tools.async_clients import AsyncFirecrawlClient
+
+        async def collect():
+            async with AsyncFirecrawlClient(pipeline.firecrawl_api_key) as client:
+                return [info async for info in pipeline.aiter_user_info_from_urls(urls, client, args.async_concurrency)]
+        return asyncio.run(collect())
+
+    def flatten():
+        return pipeline.format_user_info_to_flattened_json(user_info)
+
+    def write_csv():
+        return pipeline.write_to_csv(records, description)
+
+    def sheets():
+        from tools.sheets_writer import GoogleSheetsWriter
+        return GoogleSheetsWriter(toolset=ReplayToolset()).write(records, columns=pipeline.LEAD_FIELDNAMES)
+
+    def dashboard():
+        import app
+        from tools.lead_aggregates import AggregateCache
+        # A fresh cache each run measures the cold build, not a cache hit
+        return app.display_lead_metrics(AggregateCache().for_csv(scored_csv))
+
+    runners = {
+        "search": search, "extract": extract, "extract_async": extract_async, "flatten": flatten,
+        "csv": write_csv, "sheets": sheets, "dashboard": dashboard,
+    }
+
+    # Inputs for stages run without their predecessors
+    urls = [f"https://www.quora.com/Benchmark-thread-{i}" for i in range(pages)]
+    user_info = [api.extract_status(api.start_extract([url])["id"]) for url in urls]
+    user_info = [{"website_url": url, "user_info": response["data"]["interactions"]} for url, response in zip(urls, user_info)]
+    records = pipeline.format_user_info_to_flattened_json(user_info)
+    scored_csv = None
+
+    results = []
+    for stage_name in stages:
+        if stage_name == "dashboard" and scored_csv is None:
+            scored_csv = "scored_leads.csv"
+            score_leads(pd.DataFrame(records)).to_csv(scored_csv, index=False)
+        runs = []
+        stats = {}
+        output = None
+        # Warm-up runs pay for lazy imports and first-connection setup and are not recorded
+        for _ in range(args.warmup):
+            measure(runners[stage_name], None)
+        for _ in range(max(1, args.repeat)):
+            elapsed, output, stats = measure(runners[stage_name], STAGE_SPANS[stage_name])
+            runs.append(elapsed)
+        if stage_name == "search":
+            urls = output
+        elif stage_name in ("extract", "extract_async"):
+            user_info = output
+        elif stage_name == "flatten":
+            records = output
+
+        median = statistics.median(runs)
+        calls = stats.get("calls", 0)
+        result = {
+            "stage": stage_name,
+            "leads": n,
+            "pages": pages,
+            "runs_s": runs,
+            "median_s": median,
+            "min_s": min(runs),
+            "leads_per_s": n / median if median else None,
+            "calls": calls,
+            "mean_call_ms": stats["duration"] / calls * 1000 if calls else None,
+            "max_call_ms": stats["max_duration"] * 1000 if calls else None,
+        }
+        results.append(result)
+        print(f"{stage_name:>14} {n:>7} leads  median {median * 1000:10.1f} ms  {result['leads_per_s'] or 0:12.0f} leads/s"
+              + (f"  {calls} calls, mean {result['mean_call_ms']:.1f} ms, max {result['max_call_ms']:.1f} ms" if calls else ""))
+    return results
+
+def compare(results: List[dict], baseline_path: str, max_regression: Optional[float]) -> List[str]:
+    """Print current vs baseline medians; return the regressions over ``max_regression``."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r["stage"], r["leads"]): r for r in json.load(f)["results"]}
+    regressions = []
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        before = baseline.get((result["stage"], result["leads"]))
+        if not before or not before["median_s"]:
+            continue
+        ratio = result["median_s"] / before["median_s"]
+        print(f"{result['stage']:>14} {result['leads']:>7} leads  {before['median_s'] * 1000:10.1f} -> {result['median_s'] * 1000:10.1f} ms  x{ratio:.2f}")
+        if max_regression and ratio > max_regression:
+            regressions.append(f"{result['stage']} at {result['leads']} leads is x{ratio:.2f} slower than the baseline")
+    return regressions
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the lead pipeline stages offline against recorded responses")
+    parser.add_argument("--sizes", default=",".join(str(n) for n in DEFAULT_SIZES), help="Comma-separated lead counts")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Comma-separated subset of {', '.join(STAGES)}")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage and size; the median is reported")
+    parser.add_argument("--warmup", type=int, default=1, help="Unrecorded runs before each stage's measured runs")
+    parser.add_argument("--leads-per-page", type=int, default=100, help="Interactions returned per extracted page")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated network latency per stub response")
+    parser.add_argument("--max-workers", type=int, default=4, help="Thread pool size for the extract stage")
+    parser.add_argument("--async-concurrency", type=int, default=50, help="Concurrent extracts for the async stage")
+    parser.add_argument("--verbose", action="store_true", help="Keep the pipeline's INFO logging")
+    parser.add_argument("--json", dest="json_path", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, help="With --compare, fail if a median is this many times slower")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    stages = [stage_name for stage_name in args.stages.split(",") if stage_name]
+    unknown = [stage_name for stage_name in stages if stage_name not in STAGES]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+    if args.json_path:
+        args.json_path = os.path.abspath(args.json_path)
+    if args.compare:
+        args.compare = os.path.abspath(args.compare)
+
+    api = StubAPI(args.latency_ms)
+    server = start_stub_server(api)
+    configure_environment(f"http://127.0.0.1:{server.server_address[1]}")
+    sys.path.insert(0, REPO_ROOT)
+    if "sheets" in stages:
+        try:
+            import composio  # noqa: F401
+        except ImportError:
+            print("Skipping the sheets stage: composio is not installed")
+            stages.remove("sheets")
+
+    results = []
+    # Run from a scratch directory so CSVs and log files don't land in the repo
+    with tempfile.TemporaryDirectory() as cwd:
+        os.chdir(cwd)
+        # Import up front: module import time is startup_benchmark.py's job, and the logging setup must come after
+        import ai_lead_generation_agent  # noqa: F401
+        import app  # noqa: F401
+        if not args.verbose:
+            quiet_logging()
+        for n in sizes:
+            results.extend(run_size(n, stages, api, args))
+        os.chdir(REPO_ROOT)
+    server.shutdown()
+
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    failures = compare(results, args.compare, args.max_regression) if args.compare else []
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
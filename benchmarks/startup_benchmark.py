@@ -0,0 +1,97 @@
+# benchmarks/startup_benchmark.py
+"""Import-time budget for the Streamlit entry points.
+
+Imports each entry point in a fresh interpreter with ``-X importtime``, reports
+the heaviest imports and fails if the import takes longer than its budget or if
+any of the lazily loaded heavy dependencies got imported at startup. Modules a
+bare ``import streamlit`` already loads (plotly, on some installs) are out of
+the entry points' control and not counted.
+
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --budget-ms 800 --repeat 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry point -> import-time budget in milliseconds
+STARTUP_BUDGET_MS = {
+    "app": 1500,
+    "ai_lead_generation_agent": 1500,
+}
+
+# Packages that must only be loaded by the stage that needs them
+LAZY_MODULES = ["crewai", "agno", "firecrawl", "composio", "composio_agno", "composio_phidata", "plotly", "pyarrow", "exa_py", "httpx", "sentence_transformers", "hnswlib"]
+
+def measure_import(module: str) -> Tuple[float, List[Tuple[str, float]], List[str]]:
+    """Import ``module`` in a fresh interpreter; return (total ms, top-level imports by ms, loaded modules)."""
+    code = f"import sys, json; import {module}; print(json.dumps(sorted(sys.modules)))"
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    # Run from a scratch directory so import-time side effects (log files) don't land in the repo
+    with tempfile.TemporaryDirectory() as cwd:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True, text=True, cwd=cwd, env=env
+        )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    total_us = 0
+    top_level: Dict[str, float] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, raw_name = line.split("|")
+        name = raw_name.strip()
+        # Each nesting level indents the module name by two more spaces
+        depth = (len(raw_name) - len(raw_name.lstrip(" ")) - 1) // 2
+        if name == module:
+            total_us = int(cumulative_us)
+        elif depth == 1:
+            top_level[name] = int(cumulative_us) / 1000
+    loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+    ranked = sorted(top_level.items(), key=lambda item: item[1], reverse=True)
+    return total_us / 1000, ranked, loaded
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure and enforce entry point import time")
+    parser.add_argument("--budget-ms", type=float, help="Override the budget for every entry point")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per entry point; the fastest is reported")
+    parser.add_argument("--top", type=int, default=10, help="Number of heaviest imports to list")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    failures = []
+    report = {}
+    preloaded = set(measure_import("streamlit")[2])
+    for module, default_budget in STARTUP_BUDGET_MS.items():
+        budget = args.budget_ms or default_budget
+        runs = [measure_import(module) for _ in range(max(1, args.repeat))]
+        total_ms, ranked, loaded = min(runs, key=lambda run: run[0])
+        eager = [name for name in LAZY_MODULES if name in loaded and name not in preloaded]
+
+        print(f"{module}: {total_ms:.0f} ms (budget {budget:.0f} ms)")
+        for name, ms in ranked[:args.top]:
+            print(f"    {ms:8.1f} ms  {name}")
+        if total_ms > budget:
+            failures.append(f"{module} import took {total_ms:.0f} ms, over its {budget:.0f} ms budget")
+        if eager:
+            failures.append(f"{module} eagerly imports {', '.join(eager)}")
+        report[module] = {"total_ms": total_ms, "budget_ms": budget, "top_imports": ranked[:args.top], "eager_heavy_modules": eager}
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,9 @@
 # tasks/tasks.py
 from crewai import Task
-from typing import List
 from agents.researcher_agent import ResearcherAgent
 from agents.analyzer_agent import AnalyzerAgent
 from agents.writer_agent import WriterAgent
+from tools.registry import shared
 
 class LeadGenTasks:
     @staticmethod
@@ -22,6 +22,9 @@ class LeadGenTasks:
             - Their specific needs or interests
             - Platform where they were found
             - Level of engagement with the topic
+            
+            The search tool returns JSON records. Copy url, author and published
+            into Website URL, Username and Timestamp as given rather than retyping them.
             """,
             expected_output="""A list of potential leads in JSON format with the following structure:
             [
@@ -36,22 +39,32 @@ class LeadGenTasks:
                 }
             ]
             """,
-            agent=ResearcherAgent.create()
+            agent=shared("researcher_agent", ResearcherAgent.create)
         )
 
     @staticmethod
-    def analyze_task() -> Task:
-        return Task(
-            description="""
-            Analyze the gathered leads and add qualification data to each record.
-            For each lead, analyze:
+    def analyze_task(leads: str) -> Task:
+        """Second-look analysis of ``leads``, a JSON chunk of already scored borderline leads."""
+        description = f"""
+            Review these leads. Each one already has a deterministic Qualification
+            Score, Priority and Notes, but sits close to a priority threshold, so
+            the score alone doesn't settle it. For each lead analyze:
             1. Likelihood to convert
             2. Urgency of their need
             3. Decision-making authority
             4. Engagement level
+            and adjust its Qualification Score and Priority if needed, extend its
+            Notes and add a Recommended Approach.
             
-            Add these fields to each lead record while maintaining the original data.
-            """,
+            Keep all other fields, including "Row ID", as they are. Return exactly
+            one record per lead.
+            Leads to analyze:
+            {leads}
+            """
+        # Chunks are analyzed in parallel, so each one gets its own agent
+        agent = AnalyzerAgent.create()
+        return Task(
+            description=description,
             expected_output="""A JSON array of leads with added qualification data:
             [
                 {
@@ -66,7 +79,7 @@ class LeadGenTasks:
                 }
             ]
             """,
-            agent=AnalyzerAgent.create()
+            agent=agent
         )
 
     @staticmethod
@@ -89,5 +102,5 @@ class LeadGenTasks:
                 "status": "Success message or error details"
             }
             """,
-            agent=WriterAgent.create()
+            agent=shared("writer_agent", WriterAgent.create)
         )
\ No newline at end of file
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+
+import ai_lead_generation_agent as agent
+
+class _Client:
+    async def scrape(self, url):
+        return {"markdown": f"# {url}"}
+
+    async def extract(self, urls, params):
+        return {"success": True, "status": "completed",
+                "data": {"interactions": [{"username": "ann", "bio": "Video editor"}]}}
+
+class _RecordingStore:
+    def __init__(self):
+        self.threads = set()
+
+    def _touch(self):
+        self.threads.add(threading.current_thread())
+
+    def is_unchanged(self, url, digest):
+        self._touch()
+        return False
+
+    def record_extraction(self, url, digest, interactions):
+        self._touch()
+        return list(interactions)
+
+    def filter_new(self, records):
+        self._touch()
+        return list(records)
+
+    def get(self, url, fingerprint):
+        self._touch()
+
+    def set(self, url, fingerprint, response):
+        self._touch()
+
+def test_async_pipeline_keeps_blocking_calls_off_the_loop():
+    store = _RecordingStore()
+
+    async def run():
+        infos = [info async for info in agent.aiter_user_info_from_urls(["https://quora.com/a"], _Client(), 2, store, store)]
+        return [record for info in infos for record in await agent.aflatten_user_info(info, store)]
+
+    records = asyncio.run(run())
+    assert [record["Username"] for record in records] == ["ann"]
+    assert store.threads and threading.main_thread() not in store.threads
@@ -0,0 +1,35 @@
+from tools.job_queue import JobQueue
+
+def _dead(pid):
+    return False
+
+def test_job_that_kills_its_worker_is_failed_after_max_attempts(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+    job_id = queue.submit("crew_leads", {"target_description": "video editors"})
+    for attempt in range(1, 3):
+        assert queue.claim_next(worker_pid=1000 + attempt).attempts == attempt
+        assert queue.requeue_orphaned(is_alive=_dead, max_attempts=2) == (1 if attempt < 2 else 0)
+    job = queue.get(job_id)
+    assert job.status == "failed"
+    assert queue.claim_next(worker_pid=2000) is None
+
+def test_live_worker_keeps_its_job(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+    job_id = queue.submit("crew_leads", {})
+    queue.claim_next(worker_pid=1)
+    assert queue.requeue_orphaned(is_alive=lambda pid: True) == 0
+    assert queue.get(job_id).status == "running"
+
+def test_worker_metrics_are_rendered_by_the_server(tmp_path):
+    from tools.run_metrics import MetricsRegistry, Span
+
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+    worker = MetricsRegistry()
+    for _ in range(2):
+        worker.observe("crew_kickoff", 1.5, Span("crew_kickoff"), failed=False)
+        queue.add_metrics(worker.drain())
+    server = MetricsRegistry()
+    server.add_source(JobQueue(queue.path).metrics)
+    rendered = server.render()
+    assert 'lead_stage_spans_total{stage="crew_kickoff"} 2.0' in rendered
+    assert 'lead_stage_duration_seconds_total{stage="crew_kickoff"} 3.0' in rendered
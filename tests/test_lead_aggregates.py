@@ -0,0 +1,22 @@
+import os
+from tools.lead_aggregates import AggregateCache
+
+HEADER = "Website URL,Username,Bio,Qualification Score,Priority\n"
+
+def _write(path, text, mode="a"):
+    with open(path, mode, encoding="utf-8") as f:
+        f.write(text)
+
+def test_half_written_row_waits_for_next_refresh(tmp_path):
+    path = str(tmp_path / "leads.csv")
+    _write(path, HEADER + "https://quora.com/a,ann,Editor,5,Medium\nhttps://quora.com/b,bob,Editor,6,Medium\n", "w")
+    _write(path, 'https://quora.com/c,cat,"Editor\n')
+    cache = AggregateCache()
+    assert cache.for_csv(path).total == 2
+
+    _write(path, 'and colorist",9,High\n')
+    os.utime(path, ns=(1, 1))
+    aggregates = cache.for_csv(path)
+    assert aggregates.total == 3
+    assert aggregates.priority_counts["High"] == 1
+    assert aggregates.top_leads["Qualification Score"].max() == 9
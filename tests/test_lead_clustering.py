@@ -0,0 +1,21 @@
+from tools.lead_clustering import HashingEmbedder, LeadDeduplicator
+
+BIO = "Freelance video editor for YouTube creators"
+
+def test_handle_variants_merge_into_first_lead():
+    deduplicator = LeadDeduplicator(embedder=HashingEmbedder())
+    merged = deduplicator.merge([
+        {"Username": "john_smith", "Bio": BIO, "Links": "", "Upvotes": 3, "Website URL": "https://quora.com/a"},
+        {"Username": "John Smith", "Bio": BIO + ".", "Links": "js.dev", "Upvotes": 9, "Website URL": "https://quora.com/b"},
+    ])
+    assert len(merged) == 1
+    assert merged[0]["Username"] == "john_smith"
+    assert merged[0]["Bio"] == BIO + "."
+    assert merged[0]["Upvotes"] == 9
+    assert merged[0]["Links"] == "js.dev"
+
+def test_duplicate_of_an_earlier_batch_is_dropped():
+    deduplicator = LeadDeduplicator(embedder=HashingEmbedder())
+    deduplicator.merge([{"Username": "john_smith", "Bio": BIO, "Website URL": "https://quora.com/a"}])
+    assert deduplicator.merge([{"Username": "John Smith", "Bio": BIO, "Website URL": "https://quora.com/b"}]) == []
+    assert deduplicator.dropped == 1
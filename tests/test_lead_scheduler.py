@@ -0,0 +1,36 @@
+import ai_lead_generation_agent as agent
+from tools.lead_scheduler import YieldScheduler
+
+UNCHANGED = [f"https://www.quora.com/Old-thread-{i}" for i in range(8)]
+FRESH = [f"https://www.quora.com/New-thread-{i}" for i in range(32)]
+
+def _stub_pipeline(monkeypatch):
+    def search_for_urls(description, api_key, num_links):
+        return (UNCHANGED + FRESH)[:num_links]
+
+    def iter_user_info_from_urls(urls, api_key, max_workers, cache, thread_state, extracted):
+        for url in urls:
+            if url in UNCHANGED:
+                continue
+            extracted.append(url)
+            yield {"website_url": url, "user_info": [{"username_or_handle": f"user-{url[-2:]}", "bio": "Editor"}]}
+
+    monkeypatch.setattr(agent, "search_for_urls", search_for_urls)
+    monkeypatch.setattr(agent, "iter_user_info_from_urls", iter_user_info_from_urls)
+
+def test_unchanged_threads_are_not_charged(monkeypatch):
+    _stub_pipeline(monkeypatch)
+    scheduler = YieldScheduler(target_leads=25, max_extracts=40, batch_size=4)
+    leads = list(agent.iter_leads_adaptive("video editors", "key", scheduler))
+    assert len(leads) == 25
+    assert scheduler.extracts == 25
+    assert scheduler.stop_reason == "target met"
+    assert not set(UNCHANGED) & set(scheduler.extracted_urls)
+
+def test_skipped_batch_keeps_last_yield():
+    scheduler = YieldScheduler(target_leads=5, max_extracts=10, batch_size=2)
+    scheduler.add_search_results(["a", "b", "c", "d"], depth=4)
+    scheduler.finish_batch(scheduler.take(2), [])
+    assert scheduler.extracts == 0
+    assert scheduler.last_yield is None
+    assert scheduler.next_batch_size() == 2
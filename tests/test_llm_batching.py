@@ -0,0 +1,19 @@
+import tools.llm_batching as llm_batching
+from tools.llm_batching import ROW_ID_FIELD, run_in_chunks
+
+def test_replies_merge_back_by_row_id(monkeypatch):
+    # One token per record and a budget of three: chunks are rows 0-2, 3-5 and 6
+    monkeypatch.setattr(llm_batching, "estimate_tokens", lambda text: 1)
+    items = [{"Username": f"user{i}", "Priority": "Low"} for i in range(7)]
+
+    def process_chunk(chunk):
+        if chunk[0][ROW_ID_FIELD] == 3:
+            raise RuntimeError("model timed out")
+        # Drop the first row and return the rest reversed, with only the field the model changed
+        return [{ROW_ID_FIELD: record[ROW_ID_FIELD], "Priority": "High"} for record in reversed(chunk[1:])]
+
+    merged = run_in_chunks(items, process_chunk, "analyze", token_budget=3, max_concurrency=2)
+
+    assert [record["Username"] for record in merged] == [f"user{i}" for i in range(7)]
+    assert [record["Priority"] for record in merged] == ["Low", "High", "High", "Low", "Low", "Low", "Low"]
+    assert all(ROW_ID_FIELD not in record for record in merged)
@@ -0,0 +1,28 @@
+from tools.lead_index import LeadIndex
+from tools.pending_writes import PendingWrites
+from tools.thread_state import ThreadStateStore
+
+LEAD = {"Website URL": "https://quora.com/a", "Username": "ann", "Bio": "Video editor"}
+INTERACTION = {"username": "ann", "bio": "Video editor"}
+
+def test_nothing_is_recorded_before_commit(tmp_path):
+    index = LeadIndex(str(tmp_path / "leads.sqlite"))
+    store = ThreadStateStore(str(tmp_path / "threads.sqlite"))
+    pending = PendingWrites()
+    lead_index, thread_state = index.deferred(pending), store.deferred(pending)
+
+    assert lead_index.filter_new([LEAD]) == [LEAD]
+    assert lead_index.filter_new([LEAD]) == []
+    assert thread_state.record_extraction("https://quora.com/a", "hash", [INTERACTION]) == [INTERACTION]
+    assert thread_state.record_extraction("https://quora.com/a", "hash", [INTERACTION]) == []
+
+    # A crash here must leave the stores as they were, so a resumed run emits the lead again
+    assert len(index) == 0 and len(store) == 0
+    assert index.deferred(PendingWrites()).filter_new([LEAD]) == [LEAD]
+    assert not store.is_unchanged("https://quora.com/a", "hash")
+
+    pending.commit()
+    assert len(index) == 1
+    assert index.filter_new([LEAD]) == []
+    assert store.is_unchanged("https://quora.com/a", "hash")
+    assert store.record_extraction("https://quora.com/a", "hash2", [INTERACTION]) == []
@@ -0,0 +1,25 @@
+from tools.rate_limiter import error_status, is_retryable_error
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+class _HTTPError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.response = _Response(status_code)
+
+def test_status_from_response_wins_over_message():
+    assert not is_retryable_error(_HTTPError("Payment required for plan starter-500-a-month", 402))
+    assert is_retryable_error(_HTTPError("Too many requests", 429))
+
+def test_status_code_in_message_is_anchored():
+    assert not is_retryable_error(Exception("Bad request: limit must be under 500"))
+    assert not is_retryable_error(Exception("Status code 402. Upgrade to the pro-503 plan"))
+    assert is_retryable_error(Exception("Unexpected error during search: Status code 429. Rate limit exceeded"))
+    assert error_status(Exception("HTTP/1.1 502 Bad Gateway")) == 502
+    assert error_status(Exception("request failed with status=503")) == 503
+
+def test_transient_errors_without_status():
+    assert is_retryable_error(TimeoutError("read timed out"))
+    assert is_retryable_error(Exception("Rate limit reached, slow down"))
@@ -0,0 +1,19 @@
+from tools.fanout_search import merge_ranked
+from tools.search_results import result_from_dict, result_to_lead, results_to_json
+
+def test_merged_quora_answer_keeps_answerer():
+    merged = merge_ranked([[{"url": "https://www.quora.com/Best-video-editor/answer/Jane-Doe", "title": "Best video editor?"}]], top_k=5)
+    lead = result_to_lead(result_from_dict(merged[0]))
+    assert lead.website_url == "https://www.quora.com/Best-video-editor"
+    assert lead.username == "Jane Doe"
+    assert lead.post_type == "answer"
+
+def test_merged_quora_thread_is_a_question():
+    merged = merge_ranked([[{"url": "https://quora.com/Best-video-editor?share=1"}]], top_k=5)
+    lead = result_to_lead(result_from_dict(merged[0]))
+    assert lead.username == ""
+    assert lead.post_type == "question"
+
+def test_source_url_not_sent_to_agents():
+    merged = merge_ranked([[{"url": "https://www.quora.com/Best-video-editor/answer/Jane-Doe"}]], top_k=5)
+    assert "source_url" not in results_to_json([result_from_dict(merged[0])])
@@ -0,0 +1,179 @@
+import asyncio
+import os
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional, Type, TypeVar
+import httpx
+from tools.rate_limiter import async_rate_limited_call
+from tools.search_client import EXA_API_URL, FIRECRAWL_API_URL, FIRECRAWL_SEARCH_URL
+import logging
+
+logger = logging.getLogger(__name__)
+
+FIRECRAWL_EXTRACT_URL = f"{FIRECRAWL_API_URL}/v1/extract"
+FIRECRAWL_SCRAPE_URL = f"{FIRECRAWL_API_URL}/v1/scrape"
+EXA_SEARCH_URL = f"{EXA_API_URL}/search"
+
+# Requests in flight at once per client; override with LEAD_ASYNC_CONCURRENCY
+DEFAULT_CONCURRENCY = int(os.getenv("LEAD_ASYNC_CONCURRENCY", "50"))
+
+class AsyncAPIClient:
+    """Base for the asyncio API clients: one pooled HTTP/2 connection pool per client.
+
+    At most ``concurrency`` requests are in flight at once, and every request
+    goes through the provider's shared rate limiter. Use as an async context
+    manager, or call ``aclose()`` when done.
+    """
+
+    provider = ""
+
+    def __init__(self, api_key: str, concurrency: int = DEFAULT_CONCURRENCY, timeout: float = 90.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.api_key = api_key
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.http = httpx.AsyncClient(
+            http2=transport is None,
+            transport=transport,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            headers=self._headers(),
+        )
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Content-Type": "application/json"}
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        async with self._semaphore:
+            return await async_rate_limited_call(self.provider, self.http.request, method, url, **kwargs)
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+C = TypeVar("C", bound=AsyncAPIClient)
+
+_loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, AsyncAPIClient]]" = weakref.WeakKeyDictionary()
+_loop_clients_lock = threading.Lock()
+
+def get_async_client(client_class: Type[C], api_key: str) -> C:
+    """Process-wide ``client_class`` for ``api_key`` on the running event loop.
+
+    Every caller on the loop shares one HTTP/2 connection pool. httpx pools
+    are bound to the loop they are first used on, so each loop gets its own
+    client, dropped along with the loop.
+    """
+    loop = asyncio.get_running_loop()
+    with _loop_clients_lock:
+        clients = _loop_clients.setdefault(loop, {})
+        client = clients.get((client_class, api_key))
+        if client is None:
+            client = clients[(client_class, api_key)] = client_class(api_key)
+    return client
+
+class AsyncFirecrawlClient(AsyncAPIClient):
+    """Async client for the Firecrawl /v1/search, /v1/scrape and /v1/extract endpoints."""
+
+    provider = "firecrawl"
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+
+    async def search(self, query: str, limit: int = 5, lang: str = "en", location: str = "United States",
+                     timeout: int = 60000) -> Optional[List[dict]]:
+        """Return the search result dicts, or None if the request failed."""
+        payload = {
+            "query": query,
+            "limit": limit,
+            "lang": lang,
+            "location": location,
+            "timeout": timeout,
+        }
+        response = await self._request("POST", FIRECRAWL_SEARCH_URL, json=payload)
+        if response.status_code == 200:
+            data = response.json()
+            if data.get("success"):
+                return data.get("data", [])
+        logger.error(f"Firecrawl search failed. Status code: {response.status_code}")
+        return None
+
+    async def scrape(self, url: str, formats: Optional[List[str]] = None) -> Optional[Dict]:
+        """Return the scraped page (``markdown`` etc.), or None if the request failed."""
+        response = await self._request("POST", FIRECRAWL_SCRAPE_URL, json={"url": url, "formats": formats or ["markdown"]})
+        if response.status_code == 200:
+            data = response.json()
+            if data.get("success"):
+                return data.get("data", {})
+        logger.error(f"Firecrawl scrape failed. Status code: {response.status_code}")
+        return None
+
+    async def extract(self, urls: List[str], params: Dict, poll_interval: float = 2.0, max_wait: float = 300.0) -> Dict:
+        """Start an extract job and poll it until it finishes.
+
+        Returns the final job response, shaped like ``FirecrawlApp.extract``'s
+        (``success``, ``status`` and ``data``).
+        """
+        response = await self._request("POST", FIRECRAWL_EXTRACT_URL, json={"urls": urls, **params})
+        started = response.json() if response.status_code == 200 else {}
+        job_id = started.get("id")
+        if not started.get("success") or not job_id:
+            logger.error(f"Firecrawl extract failed to start. Status code: {response.status_code}")
+            return {"success": False, "status": "failed", "error": started.get("error")}
+        # Some responses already carry the finished result
+        if started.get("status") == "completed":
+            return started
+
+        deadline = time.monotonic() + max_wait
+        while True:
+            response = await self._request("GET", f"{FIRECRAWL_EXTRACT_URL}/{job_id}")
+            if response.status_code == 200:
+                status = response.json()
+                if status.get("status") in ("completed", "failed", "cancelled"):
+                    return status
+            if time.monotonic() + poll_interval > deadline:
+                break
+            await asyncio.sleep(poll_interval)
+        logger.error(f"Firecrawl extract job {job_id} timed out after {max_wait:.0f}s")
+        return {"success": False, "status": "timeout", "id": job_id}
+
+class AsyncExaClient(AsyncAPIClient):
+    """Async client for Exa search with contents (the equivalent of ``Exa.search_and_contents``)."""
+
+    provider = "exa"
+
+    def _headers(self) -> Dict[str, str]:
+        return {"x-api-key": self.api_key, "Content-Type": "application/json"}
+
+    async def search(self, query: str, num_results: int = 5, type: str = "neural", use_autoprompt: bool = True,
+                     include_domains: Optional[List[str]] = None) -> List[dict]:
+        """Return the result dicts (title, url, ...) without page contents. Raises on HTTP errors."""
+        payload = {
+            "query": query,
+            "type": type,
+            "useAutoprompt": use_autoprompt,
+            "numResults": num_results,
+        }
+        if include_domains:
+            payload["includeDomains"] = include_domains
+        response = await self._request("POST", EXA_SEARCH_URL, json=payload)
+        response.raise_for_status()
+        return response.json().get("results", [])
+
+    async def search_and_contents(self, query: str, num_results: int = 5, type: str = "neural",
+                                  use_autoprompt: bool = True, highlights: bool = True) -> List[dict]:
+        """Return the result dicts (title, url, highlights, ...). Raises on HTTP errors."""
+        payload = {
+            "query": query,
+            "type": type,
+            "useAutoprompt": use_autoprompt,
+            "numResults": num_results,
+            "contents": {"highlights": highlights},
+        }
+        response = await self._request("POST", EXA_SEARCH_URL, json=payload)
+        response.raise_for_status()
+        return response.json().get("results", [])
@@ -18,26 +18,34 @@ class CSVWriterTool(BaseTool):
     args_schema: Type[BaseModel] = CSVWriterInput
 
     def _run(self, data: List[Dict], company_description: str) -> str:
-        logger.info(f"Starting CSV write operation for {len(data)} records")
-        
         try:
-            # Create output directory if it doesn't exist
-            output_dir = "lead_generation_output"
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # Generate filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{output_dir}/leads_{company_description.replace(' ', '_')}_{timestamp}.csv"
-            
-            # Write to CSV
-            with open(filename, 'w', newline='', encoding='utf-8') as f:
-                if data:
-                    writer = csv.DictWriter(f, fieldnames=data[0].keys())
-                    writer.writeheader()
-                    writer.writerows(data)
-            
-            logger.info(f"Successfully wrote data to CSV: {filename}")
-            return filename
+            return write_leads_csv(data, company_description)
         except Exception as e:
             logger.error(f"Error writing to CSV: {str(e)}", exc_info=True)
-            raise Exception(f"Failed to write CSV: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Failed to write CSV: {str(e)}")
+
+def write_leads_csv(data: List[Dict], company_description: str) -> str:
+    """Write lead records to a timestamped CSV in the output directory and return its path."""
+    logger.info(f"Starting CSV write operation for {len(data)} records")
+    
+    # Create output directory if it doesn't exist
+    output_dir = "lead_generation_output"
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Generate filename with timestamp
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{output_dir}/leads_{company_description.replace(' ', '_')}_{timestamp}.csv"
+    
+    # Write to CSV
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        if data:
+            # Union of keys, since analyzed records don't all carry the same optional fields
+            fieldnames = list(data[0].keys())
+            for record in data:
+                fieldnames.extend(key for key in record if key not in fieldnames)
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(data)
+    
+    logger.info(f"Successfully wrote data to CSV: {filename}")
+    return filename
\ No newline at end of file
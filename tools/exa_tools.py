@@ -1,8 +1,10 @@
 from crewai.tools import BaseTool
-from typing import Type
+from typing import List, Type
 from pydantic import BaseModel, Field
-from exa_py import Exa
 import os
+from tools.rate_limiter import rate_limited_call
+from tools.search_client import get_exa_client
+from tools.search_results import SearchResult, result_from_dict, result_from_exa, results_to_json
 
 class ExaSearchInput(BaseModel):
     query: str = Field(..., description="Search query to find relevant content")
@@ -10,27 +12,35 @@ class ExaSearchInput(BaseModel):
 
 class ExaSearchTool(BaseTool):
     name: str = "Exa Search Tool"
-    description: str = "Search for relevant content using Exa's semantic search capabilities"
+    description: str = (
+        "Search for relevant content using Exa's semantic search capabilities. "
+        "Returns a JSON array of {url, title, snippet, platform, author, published}."
+    )
     args_schema: Type[BaseModel] = ExaSearchInput
 
     def _run(self, query: str, num_results: int = 5) -> str:
-        exa = Exa(api_key=os.getenv("EXA_API_KEY"))
-        
-        response = exa.search_and_contents(
-            query,
-            type="neural",
-            use_autoprompt=True,
-            num_results=num_results,
-            highlights=True
-        )
-        
-        results = []
-        for idx, result in enumerate(response.results):
-            results.append(f"""
-            Result {idx + 1}:
-            Title: {result.title}
-            URL: {result.url}
-            Highlights: {"".join(result.highlights)}
-            """)
-            
-        return "\n".join(results)
\ No newline at end of file
+        return results_to_json(exa_search_results(query, num_results))
+
+    async def _arun(self, query: str, num_results: int = 5) -> str:
+        """Async counterpart of _run over the process-wide pooled HTTP/2 Exa client."""
+        return results_to_json(await exa_search_results_async(query, num_results))
+
+def exa_search_results(query: str, num_results: int = 5) -> List[SearchResult]:
+    """Structured Exa results, for the tool and for code paths that skip the agent."""
+    exa = get_exa_client(os.getenv("EXA_API_KEY"))
+    response = rate_limited_call(
+        "exa",
+        exa.search_and_contents,
+        query,
+        type="neural",
+        use_autoprompt=True,
+        num_results=num_results,
+        highlights=True
+    )
+    return [result_from_exa(result) for result in response.results]
+
+async def exa_search_results_async(query: str, num_results: int = 5) -> List[SearchResult]:
+    from tools.async_clients import AsyncExaClient, get_async_client
+
+    results = await get_async_client(AsyncExaClient, os.getenv("EXA_API_KEY")).search_and_contents(query, num_results=num_results)
+    return [result_from_dict(result) for result in results]
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "lead_generation_cache/extract_cache.sqlite"
+
+def schema_fingerprint(prompt: str, schema: dict) -> str:
+    """Hash the extraction prompt and JSON schema so any change invalidates old entries."""
+    payload = json.dumps({"prompt": prompt, "schema": schema}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ExtractCache:
+    """SQLite-backed cache of Firecrawl extract responses keyed by URL + prompt/schema hash.
+
+    Entries expire after ``ttl_seconds`` and the least recently used entries are
+    evicted once the cache holds more than ``max_entries`` rows.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_seconds: float = 7 * 24 * 3600, max_entries: int = 10000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS extract_cache (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_extract_cache_lru ON extract_cache(last_accessed)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(url: str, fingerprint: str) -> str:
+        return hashlib.sha256(f"{url}\n{fingerprint}".encode("utf-8")).hexdigest()
+
+    def get(self, url: str, fingerprint: str) -> Optional[dict]:
+        key = self.make_key(url, fingerprint)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM extract_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM extract_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE extract_cache SET last_accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        logger.debug(f"Extract cache hit for {url}")
+        return json.loads(response)
+
+    def set(self, url: str, fingerprint: str, response: dict) -> None:
+        key = self.make_key(url, fingerprint)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extract_cache (key, url, response, created_at, last_accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, url, json.dumps(response), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # Drop expired rows first, then trim the least recently used ones
+        self._conn.execute("DELETE FROM extract_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM extract_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM extract_cache WHERE key IN (SELECT key FROM extract_cache ORDER BY last_accessed ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            (size,) = self._conn.execute("SELECT COUNT(*) FROM extract_cache").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "size": size}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
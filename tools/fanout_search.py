@@ -0,0 +1,158 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from tools.rate_limiter import rate_limited_call
+from tools.run_metrics import stage
+from tools.search_client import get_exa_client, get_search_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Query variants sent to Firecrawl search; {description} is the condensed target description
+QUERY_TEMPLATES = [
+    "quora websites where people are looking for {description} services",
+    "site:quora.com {description}",
+    "site:quora.com best {description} recommendations",
+    "site:quora.com looking for {description}",
+]
+
+# Exa gets one natural-language query; it does its own query expansion
+EXA_QUERY_TEMPLATE = "people asking for recommendations on {description}"
+
+QUORA_DOMAINS = ["quora.com"]
+
+TRACKING_PARAMS = {"fbclid", "gclid", "msclkid", "ref", "ref_src", "share", "srid", "ch", "oid", "top_ans", "target_type", "mc_cid", "mc_eid"}
+
+# Reciprocal rank fusion constant; larger values flatten the rank differences between lists
+RRF_K = 60
+
+def canonical_url(url: str) -> Optional[str]:
+    """Normalize a URL so the same page found by different queries or sources compares equal.
+
+    Lowercases the scheme and host, drops fragments and tracking parameters,
+    and trailing slashes. Quora answer, log and mobile URLs collapse onto
+    their question thread, which is what gets extracted. Returns None for
+    anything that isn't an http(s) URL.
+    """
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https"):
+        return None
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = parts.path or "/"
+
+    if host in ("quora.com", "www.quora.com", "m.quora.com") or host.endswith(".quora.com"):
+        if host in ("quora.com", "m.quora.com"):
+            host = "www.quora.com"
+        segments = [segment for segment in path.split("/") if segment]
+        # /<Question-Slug>/answer/<User> and /<Question-Slug>/log are views of the thread
+        for marker in ("answer", "answers", "log"):
+            if marker in segments[1:]:
+                segments = segments[:segments.index(marker, 1)]
+        return urlunsplit(("https", host, "/" + "/".join(segments), "", ""))
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    )
+    if len(path) > 1:
+        path = path.rstrip("/")
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+def build_queries(description: str, templates: Sequence[str] = QUERY_TEMPLATES) -> List[str]:
+    return [template.format(description=description) for template in templates]
+
+def merge_ranked(result_lists: List[List[dict]], top_k: int) -> List[dict]:
+    """Merge ranked search result lists into unique URLs ordered by reciprocal rank fusion.
+
+    A URL found by several queries or sources outranks one found once at the
+    same position. Each merged result keeps the first title/snippet seen, and the
+    URL it was found under as ``source_url`` (e.g. the Quora answer behind a
+    thread), and records its fused ``score`` and the number of lists (``hits``) it appeared in.
+    """
+    merged: Dict[str, dict] = {}
+    for results in result_lists:
+        seen_in_list = set()
+        for rank, result in enumerate(results):
+            url = canonical_url(result.get("url", ""))
+            if url is None or url in seen_in_list:
+                continue
+            seen_in_list.add(url)
+            entry = merged.get(url)
+            if entry is None:
+                entry = merged[url] = {**result, "url": url, "source_url": result["url"], "score": 0.0, "hits": 0}
+            entry["score"] += 1.0 / (RRF_K + rank + 1)
+            entry["hits"] += 1
+    # sorted() is stable, so ties keep first-seen order
+    return sorted(merged.values(), key=lambda entry: entry["score"], reverse=True)[:top_k]
+
+def _exa_search(query: str, api_key: str, num_results: int, include_domains: Optional[List[str]]) -> List[dict]:
+    exa = get_exa_client(api_key)
+    kwargs = {"include_domains": include_domains} if include_domains else {}
+    response = rate_limited_call("exa", exa.search, query, type="neural", use_autoprompt=True, num_results=num_results, **kwargs)
+    return [
+        {"url": result.url, "title": result.title, "author": result.author, "publishedDate": result.published_date}
+        for result in response.results
+    ]
+
+def fan_out_search(description: str, firecrawl_api_key: str, top_k: int, per_query_limit: Optional[int] = None,
+                   exa_api_key: Optional[str] = None, exa_domains: Optional[List[str]] = QUORA_DOMAINS,
+                   templates: Sequence[str] = QUERY_TEMPLATES) -> List[dict]:
+    """Run every query variant (and Exa, when a key is given) concurrently and return the merged top ``top_k``.
+
+    A failed variant is logged and skipped; the others still contribute.
+    """
+    queries = build_queries(description, templates)
+    limit = per_query_limit or top_k
+    client = get_search_client()
+    with stage("search", items_in=len(queries) + int(bool(exa_api_key))) as span:
+        with ThreadPoolExecutor(max_workers=len(queries) + 1) as executor:
+            # Run each search in a copy of the caller's context so API calls are attributed to this span
+            futures = [
+                executor.submit(contextvars.copy_context().run, client.search, query, firecrawl_api_key, limit=limit)
+                for query in queries
+            ]
+            if exa_api_key:
+                futures.append(executor.submit(
+                    contextvars.copy_context().run, _exa_search, EXA_QUERY_TEMPLATE.format(description=description),
+                    exa_api_key, limit, exa_domains
+                ))
+            result_lists = []
+            for future in futures:
+                try:
+                    result_lists.append(future.result() or [])
+                except Exception as e:
+                    logger.error(f"Search variant failed: {str(e)}", exc_info=True)
+        merged = merge_ranked(result_lists, top_k)
+        span.items_out = len(merged)
+    total = sum(len(results) for results in result_lists)
+    logger.info(f"Fan-out search: {len(result_lists)} lists, {total} results, {len(merged)} unique URLs kept")
+    return merged
+
+async def fan_out_search_async(description: str, firecrawl_client, top_k: int, per_query_limit: Optional[int] = None,
+                               exa_client=None, exa_domains: Optional[List[str]] = QUORA_DOMAINS,
+                               templates: Sequence[str] = QUERY_TEMPLATES) -> List[dict]:
+    """Async counterpart of fan_out_search over AsyncFirecrawlClient / AsyncExaClient."""
+    queries = build_queries(description, templates)
+    limit = per_query_limit or top_k
+    with stage("search", items_in=len(queries) + int(exa_client is not None)) as span:
+        calls = [firecrawl_client.search(query, limit=limit) for query in queries]
+        if exa_client is not None:
+            calls.append(exa_client.search(EXA_QUERY_TEMPLATE.format(description=description), num_results=limit,
+                                           include_domains=exa_domains))
+        result_lists = []
+        for results in await asyncio.gather(*calls, return_exceptions=True):
+            if isinstance(results, Exception):
+                logger.error(f"Search variant failed: {str(results)}")
+                continue
+            result_lists.append(results or [])
+        merged = merge_ranked(result_lists, top_k)
+        span.items_out = len(merged)
+    logger.info(f"Fan-out search: {len(result_lists)} lists, {len(merged)} unique URLs kept")
+    return merged
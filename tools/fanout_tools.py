@@ -0,0 +1,35 @@
+from crewai.tools import BaseTool
+from typing import Type
+from pydantic import BaseModel, Field
+import os
+from tools.fanout_search import fan_out_search
+from tools.search_results import result_from_dict, results_to_json
+
+class FanOutSearchInput(BaseModel):
+    query: str = Field(..., description="Short description of the product/service the leads are looking for")
+    num_results: int = Field(default=10, description="Number of unique URLs to return")
+
+class FanOutSearchTool(BaseTool):
+    name: str = "Lead Source Search Tool"
+    description: str = (
+        "Search Quora with several query variants and Exa across other platforms at once. "
+        "Returns a JSON array of unique, deduplicated results {url, title, snippet, platform, author, published, hits}, "
+        "ranked by how many searches found them."
+    )
+    args_schema: Type[BaseModel] = FanOutSearchInput
+
+    def _run(self, query: str, num_results: int = 10) -> str:
+        try:
+            # Exa searches every platform here; the Quora-only restriction is for the extract pipeline
+            results = fan_out_search(
+                query,
+                os.getenv('FIRECRAWL_API_KEY'),
+                top_k=num_results,
+                exa_api_key=os.getenv('EXA_API_KEY'),
+                exa_domains=None
+            )
+        except Exception as e:
+            return f"Error searching for leads: {str(e)}"
+        if not results:
+            return "No results found"
+        return results_to_json(result_from_dict(result) for result in results)
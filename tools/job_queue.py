@@ -0,0 +1,298 @@
+import importlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from typing import Callable, Dict, List, Optional
+from tools.run_metrics import METRICS
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_PATH = "lead_generation_cache/jobs.sqlite"
+
+# Seconds between checks for dead worker processes
+SUPERVISE_INTERVAL = 5.0
+
+# Runs of a job allowed to kill their worker before it is failed instead of requeued; override with LEAD_JOB_MAX_ATTEMPTS
+MAX_JOB_ATTEMPTS = int(os.getenv("LEAD_JOB_MAX_ATTEMPTS", "3"))
+
+# Job kind -> "module:function" handler, imported inside the worker process
+JOB_HANDLERS = {
+    "crew_leads": "app:run_crew_job",
+}
+
+def pid_alive(pid: int) -> bool:
+    """Whether a process with this pid exists on this host."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user
+        return True
+    return True
+
+class Job:
+    """Snapshot of a job row."""
+
+    __slots__ = ("id", "kind", "payload", "status", "phase", "progress", "result", "error", "attempts", "created_at", "updated_at")
+
+    def __init__(self, row: sqlite3.Row):
+        self.id = row["id"]
+        self.kind = row["kind"]
+        self.payload = json.loads(row["payload"])
+        self.status = row["status"]
+        self.phase = row["phase"]
+        self.progress = row["progress"]
+        self.result = json.loads(row["result"]) if row["result"] else None
+        self.error = row["error"]
+        self.attempts = row["attempts"]
+        self.created_at = row["created_at"]
+        self.updated_at = row["updated_at"]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+class JobQueue:
+    """SQLite-backed job queue shared by the Streamlit processes and the worker pool.
+
+    Status moves queued -> running -> done/failed. Workers claim jobs atomically,
+    so any number of processes can poll the same database.
+    """
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                phase TEXT,
+                progress REAL NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                worker_pid INTEGER,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "attempts" not in columns:
+            # Queues created before attempts were counted
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+        # Stage counters from the worker processes, served by the process exposing /metrics
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS stage_metrics (
+                name TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                value REAL NOT NULL,
+                PRIMARY KEY (name, stage)
+            ) WITHOUT ROWID"""
+        )
+
+    def submit(self, kind: str, payload: Dict) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, phase, created_at, updated_at) VALUES (?, ?, ?, 'queued', 'Queued', ?, ?)",
+                (job_id, kind, json.dumps(payload), now, now)
+            )
+        logger.info(f"Submitted {kind} job {job_id}")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job(row) if row else None
+
+    def claim_next(self, worker_pid: int) -> Optional[Job]:
+        """Atomically move the oldest queued job to running, counting the attempt, and return it."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'running', phase = 'Starting', worker_pid = ?, attempts = attempts + 1, updated_at = ? "
+                    "WHERE id = ?",
+                    (worker_pid, time.time(), row["id"])
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row["id"])
+
+    def update_progress(self, job_id: str, phase: str, progress: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET phase = ?, progress = ?, updated_at = ? WHERE id = ?",
+                (phase, progress, time.time(), job_id)
+            )
+
+    def finish(self, job_id: str, result: Dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', phase = 'Completed', progress = 1, result = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(result, default=str), time.time(), job_id)
+            )
+
+    def fail(self, job_id: str, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', phase = 'Failed', error = ?, updated_at = ? WHERE id = ?",
+                (error, time.time(), job_id)
+            )
+
+    def requeue_orphaned(self, is_alive: Callable[[int], bool] = pid_alive, max_attempts: int = MAX_JOB_ATTEMPTS) -> int:
+        """Put running jobs whose worker process is gone back in the queue.
+
+        Jobs whose worker is still alive, whichever server started it, are left
+        alone. A job that has already taken down ``max_attempts`` workers is
+        failed instead, so a job that crashes its worker isn't retried forever.
+        """
+        exhausted = []
+        with self._lock:
+            running = self._conn.execute("SELECT id, worker_pid, attempts FROM jobs WHERE status = 'running'").fetchall()
+            requeued = 0
+            for row in running:
+                if row["worker_pid"] is not None and is_alive(row["worker_pid"]):
+                    continue
+                if row["attempts"] >= max_attempts:
+                    exhausted.append(row)
+                    continue
+                # Only if it is still the same claim; the job may have finished or moved on meanwhile
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', phase = 'Queued', progress = 0, worker_pid = NULL, updated_at = ? "
+                    "WHERE id = ? AND status = 'running' AND worker_pid IS ?",
+                    (time.time(), row["id"], row["worker_pid"])
+                )
+                requeued += cursor.rowcount
+        for row in exhausted:
+            logger.error(f"Job {row['id']} killed its worker on each of {row['attempts']} attempts, failing it")
+            self.fail(row["id"], f"Worker process died on each of {row['attempts']} attempts")
+        return requeued
+
+    def add_metrics(self, counters: Dict[str, Dict[str, float]]) -> None:
+        """Add a worker's stage counters to the shared totals."""
+        rows = [(name, stage, value) for name, series in counters.items() for stage, value in series.items()]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO stage_metrics (name, stage, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name, stage) DO UPDATE SET value = value + excluded.value",
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Stage counters every worker has added so far."""
+        with self._lock:
+            rows = self._conn.execute("SELECT name, stage, value FROM stage_metrics").fetchall()
+        counters: Dict[str, Dict[str, float]] = {}
+        for row in rows:
+            counters.setdefault(row["name"], {})[row["stage"]] = row["value"]
+        return counters
+
+def _resolve_handler(kind: str) -> Callable:
+    module_name, func_name = JOB_HANDLERS[kind].split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+def worker_loop(queue_path: str, poll_interval: float = 1.0) -> None:
+    """Claim and run jobs forever. Runs in a worker process."""
+    from dotenv import load_dotenv
+    load_dotenv()
+    queue = JobQueue(queue_path)
+    pid = os.getpid()
+    while True:
+        job = queue.claim_next(pid)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        logger.info(f"Worker {pid} running {job.kind} job {job.id}")
+
+        def progress(phase: str, fraction: float, job_id: str = job.id) -> None:
+            queue.update_progress(job_id, phase, fraction)
+
+        try:
+            result = _resolve_handler(job.kind)(job.payload, progress)
+            queue.finish(job.id, result)
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}", exc_info=True)
+            queue.fail(job.id, f"{str(e)}\n{traceback.format_exc()}")
+        finally:
+            # Spans only reach this process's registry; hand them to the server's /metrics through the queue
+            queue.add_metrics(METRICS.drain())
+
+class WorkerPool:
+    """A bounded set of worker processes draining the job queue.
+
+    A supervisor thread replaces workers that die and requeues the job they
+    were running, so no job stays "running" forever.
+    """
+
+    def __init__(self, queue_path: str = DEFAULT_QUEUE_PATH, workers: Optional[int] = None):
+        self.queue_path = queue_path
+        self.workers = workers or int(os.getenv("LEAD_JOB_WORKERS", "2"))
+        self.processes: List[multiprocessing.Process] = []
+        # spawn rather than fork: the Streamlit server process is multi-threaded
+        self._context = multiprocessing.get_context("spawn")
+
+    def start(self) -> "WorkerPool":
+        queue = JobQueue(self.queue_path)
+        # Jobs run in the workers, so their stage metrics reach /metrics through the queue
+        METRICS.add_source(queue.metrics)
+        requeued = queue.requeue_orphaned()
+        if requeued:
+            logger.info(f"Requeued {requeued} jobs whose worker is gone")
+        self.processes = [self._spawn() for _ in range(self.workers)]
+        threading.Thread(target=self._supervise, args=(queue,), name="job-pool-supervisor", daemon=True).start()
+        logger.info(f"Started {self.workers} job workers")
+        return self
+
+    def _spawn(self) -> multiprocessing.Process:
+        process = self._context.Process(target=worker_loop, args=(self.queue_path,), daemon=True)
+        process.start()
+        return process
+
+    def _supervise(self, queue: JobQueue) -> None:
+        while True:
+            time.sleep(SUPERVISE_INTERVAL)
+            # is_alive() also reaps the dead child, so its pid no longer looks alive to requeue_orphaned
+            dead = [index for index, process in enumerate(self.processes) if not process.is_alive()]
+            if not dead:
+                continue
+            for index in dead:
+                logger.warning(f"Job worker {self.processes[index].pid} exited with code "
+                               f"{self.processes[index].exitcode}, restarting it")
+                self.processes[index] = self._spawn()
+            requeued = queue.requeue_orphaned()
+            if requeued:
+                logger.info(f"Requeued {requeued} jobs from dead workers")
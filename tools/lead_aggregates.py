@@ -0,0 +1,239 @@
+import copy
+import glob
+import io
+import os
+import threading
+from typing import Callable, Dict, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+from tools.lead_scoring import SCORING_COLUMNS, score_leads
+import logging
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_ORDER = ["High", "Medium", "Low"]
+
+# Columns shown in the top leads table
+TOP_LEAD_COLUMNS = ['Username', 'Platform', 'Qualification Score', 'Priority', 'Notes']
+
+# Columns read from the dataset: everything aggregated or shown in the top leads table, not bios or links
+DASHBOARD_COLUMNS = list(dict.fromkeys(TOP_LEAD_COLUMNS + ['Platform', 'Priority', 'Qualification Score']))
+
+# Qualification scores are 1-10; the histogram has one bin per point
+SCORE_BINS = list(range(1, 11))
+
+# Rows parsed per chunk when scanning a CSV, bounding memory for very large files
+CSV_CHUNK_ROWS = 200_000
+
+# Bytes before the last read offset compared on refresh to tell an append from a rewrite
+_TAIL_BYTES = 256
+
+# "7", "7.5", "7/10" -> first number; "6-8", "6 to 8" -> midpoint
+_SCORE_PATTERN = r"(?P<low>\d+(?:\.\d+)?)(?:\s*(?:-|–|to)\s*(?P<high>\d+(?:\.\d+)?))?"
+
+def _complete_rows_end(data: bytes) -> int:
+    """Length of the leading complete CSV rows in ``data``: up to the last newline outside a quoted field."""
+    end = data.rfind(b"\n")
+    while end >= 0:
+        # A newline ends a row only when the quotes before it are balanced, since bios may contain line breaks
+        if data.count(b'"', 0, end) % 2 == 0:
+            return end + 1
+        end = data.rfind(b"\n", 0, end)
+    return 0
+
+def _map_unique(values: pd.Series, fn: Callable[[pd.Series], pd.Series]) -> np.ndarray:
+    """Apply a Series function once per distinct value and broadcast the result back to every row."""
+    codes, uniques = pd.factorize(values)
+    mapped = np.asarray(fn(pd.Series(uniques, dtype=object)), dtype=object)
+    return np.where(codes >= 0, mapped[codes] if len(mapped) else None, None)
+
+def coerce_scores(values: pd.Series) -> pd.Series:
+    """Parse LLM qualification scores ("7", "7/10", "6-8") into floats; unparseable values become NaN."""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+
+    def parse(unique: pd.Series) -> pd.Series:
+        parts = unique.astype(str).str.extract(_SCORE_PATTERN)
+        low = pd.to_numeric(parts["low"], errors="coerce")
+        high = pd.to_numeric(parts["high"], errors="coerce")
+        return low.where(high.isna(), (low + high) / 2)
+
+    return pd.Series(_map_unique(values, parse), index=values.index, dtype=float)
+
+def coerce_priority(values: pd.Series) -> pd.Series:
+    """Normalize priorities ("high", " HIGH ") to an ordered High/Medium/Low categorical."""
+    normalized = _map_unique(values, lambda unique: unique.astype(str).str.strip().str.title())
+    return pd.Series(pd.Categorical(normalized, categories=PRIORITY_ORDER, ordered=True), index=values.index)
+
+def prepare_leads(df: pd.DataFrame) -> pd.DataFrame:
+    """Typed copy of a leads frame: numeric scores and upvotes, categorical priority and platform.
+
+    Leads the analyzer never scored get the deterministic fallback scores.
+    """
+    if "Qualification Score" not in df.columns or df["Qualification Score"].isna().all():
+        df = score_leads(df)
+    else:
+        df = df.copy()
+    df["Qualification Score"] = coerce_scores(df["Qualification Score"])
+    if "Upvotes" in df.columns:
+        df["Upvotes"] = pd.to_numeric(df["Upvotes"], errors="coerce")
+    if "Priority" in df.columns:
+        df["Priority"] = coerce_priority(df["Priority"])
+    if "Platform" in df.columns:
+        df["Platform"] = df["Platform"].astype("category")
+    return df
+
+class LeadAggregates:
+    """Everything the lead dashboard charts, folded up from batches of prepared leads.
+
+    Aggregates are additive, so leads appended later are merged in with
+    ``update`` without rescanning the leads already counted.
+    """
+
+    def __init__(self, top_k: int = 5):
+        self.top_k = top_k
+        self.total = 0
+        self.score_sum = 0.0
+        self.score_count = 0
+        self.score_histogram = np.zeros(len(SCORE_BINS), dtype=np.int64)
+        self.priority_counts = pd.Series(0, index=PRIORITY_ORDER, dtype=np.int64)
+        self.platform_counts = pd.Series(dtype=np.int64)
+        self.top_leads = pd.DataFrame(columns=TOP_LEAD_COLUMNS)
+        self.columns: Set[str] = set()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, top_k: int = 5) -> "LeadAggregates":
+        return cls(top_k).update(prepare_leads(df))
+
+    def update(self, df: pd.DataFrame) -> "LeadAggregates":
+        """Fold a batch of leads already passed through ``prepare_leads`` into the aggregates."""
+        self.total += len(df)
+        self.columns.update(df.columns)
+
+        if "Qualification Score" in df.columns:
+            scores = df["Qualification Score"].to_numpy(dtype=float)
+            valid = scores[~np.isnan(scores)]
+            self.score_sum += float(valid.sum())
+            self.score_count += len(valid)
+            bins = np.clip(np.rint(valid), SCORE_BINS[0], SCORE_BINS[-1]).astype(np.int64) - SCORE_BINS[0]
+            self.score_histogram += np.bincount(bins, minlength=len(SCORE_BINS))
+
+            top = df.nlargest(self.top_k, "Qualification Score")[[c for c in TOP_LEAD_COLUMNS if c in df.columns]]
+            if len(self.top_leads):
+                # Categoricals from different batches don't share categories; compare as plain values
+                top = pd.concat([self.top_leads.astype(object), top.astype(object)], ignore_index=True)
+                top["Qualification Score"] = top["Qualification Score"].astype(float)
+            self.top_leads = top.nlargest(self.top_k, "Qualification Score").reset_index(drop=True)
+
+        if "Priority" in df.columns:
+            counts = df["Priority"].value_counts().reindex(PRIORITY_ORDER, fill_value=0)
+            self.priority_counts = self.priority_counts.add(counts.astype(np.int64), fill_value=0).astype(np.int64)
+
+        if "Platform" in df.columns:
+            counts = df["Platform"].value_counts()
+            counts = counts[counts > 0]
+            counts.index = counts.index.astype(object)
+            self.platform_counts = self.platform_counts.add(counts, fill_value=0).astype(np.int64).sort_values(ascending=False)
+        return self
+
+    @property
+    def avg_score(self) -> float:
+        return self.score_sum / self.score_count if self.score_count else 0.0
+
+    def has(self, column: str) -> bool:
+        return column in self.columns
+
+class _Source:
+    __slots__ = ("signature", "offset", "tail", "columns", "files", "aggregates")
+
+    def __init__(self, aggregates: LeadAggregates):
+        self.signature: Optional[Tuple[int, int]] = None
+        self.offset = 0
+        self.tail = b""
+        self.columns = None
+        self.files: Set[str] = set()
+        self.aggregates = aggregates
+
+class AggregateCache:
+    """Dashboard aggregates per leads CSV or Parquet dataset, refreshed incrementally.
+
+    A source is re-read only when it changes on disk: rows appended to a CSV
+    and new part files in the dataset are folded into the existing aggregates,
+    anything else triggers a full rebuild. Callers get an immutable snapshot,
+    so a refresh never changes aggregates another session is rendering.
+    """
+
+    def __init__(self, top_k: int = 5):
+        self.top_k = top_k
+        self._sources: Dict[str, _Source] = {}
+        self._lock = threading.Lock()
+
+    def for_csv(self, path: str) -> LeadAggregates:
+        with self._lock:
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            source = self._sources.get(path)
+            if source is not None and source.signature == signature:
+                return source.aggregates
+            if source is None or not self._is_append(path, source, stat.st_size):
+                source = self._sources[path] = _Source(LeadAggregates(self.top_k))
+            try:
+                self._read_csv(path, source, stat.st_size)
+            except (pd.errors.ParserError, ValueError) as e:
+                logger.warning(f"Incremental read of {path} failed, rebuilding aggregates: {str(e)}")
+                source = self._sources[path] = _Source(LeadAggregates(self.top_k))
+                self._read_csv(path, source, stat.st_size)
+            source.signature = signature
+            return source.aggregates
+
+    def for_dataset(self, base_dir: str) -> LeadAggregates:
+        """Aggregates over every Parquet part file under ``base_dir``; each file is read once, charted columns only."""
+        from tools.lead_dataset import read_leads_dataset
+
+        with self._lock:
+            files = set(glob.glob(os.path.join(base_dir, "**", "*.parquet"), recursive=True))
+            source = self._sources.get(base_dir)
+            if source is None or not source.files <= files:
+                source = self._sources[base_dir] = _Source(LeadAggregates(self.top_k))
+            new_files = sorted(files - source.files)
+            if not new_files:
+                return source.aggregates
+            aggregates = copy.deepcopy(source.aggregates)
+            for path in new_files:
+                df = read_leads_dataset(DASHBOARD_COLUMNS, base_dir, files=[path])
+                if df["Qualification Score"].isna().all():
+                    # Unscored leads get the fallback scores, which need the raw lead fields
+                    df = read_leads_dataset(DASHBOARD_COLUMNS + SCORING_COLUMNS, base_dir, files=[path])
+                aggregates.update(prepare_leads(df))
+            logger.info(f"Folded {len(new_files)} new dataset files into the dashboard aggregates ({aggregates.total} leads)")
+            source.files |= set(new_files)
+            source.aggregates = aggregates
+            return aggregates
+
+    def _is_append(self, path: str, source: _Source, size: int) -> bool:
+        if size <= source.offset:
+            return False
+        with open(path, "rb") as f:
+            f.seek(source.offset - len(source.tail))
+            return f.read(len(source.tail)) == source.tail
+
+    def _read_csv(self, path: str, source: _Source, size: int) -> None:
+        with open(path, "rb") as f:
+            f.seek(source.offset)
+            # Only read up to the size we stat'ed, so rows written meanwhile wait for the next refresh
+            data = f.read(size - source.offset)
+        # A row still being written is left for the next refresh rather than parsed half-done
+        data = data[:_complete_rows_end(data)]
+        if not data.strip():
+            return
+        buffer = io.BytesIO(data)
+        if source.columns is None:
+            source.columns = list(pd.read_csv(buffer, nrows=0).columns)
+            buffer.seek(data.index(b"\n") + 1 if b"\n" in data else len(data))
+        aggregates = copy.deepcopy(source.aggregates)
+        if buffer.tell() < len(data):
+            for chunk in pd.read_csv(buffer, header=None, names=source.columns, chunksize=CSV_CHUNK_ROWS):
+                aggregates.update(prepare_leads(chunk))
+        source.aggregates = aggregates
+        source.offset += len(data)
+        source.tail = (source.tail + data)[-_TAIL_BYTES:]
@@ -0,0 +1,218 @@
+import os
+import re
+import threading
+import zlib
+from typing import List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+from tools.lead_records import LeadRecord
+from tools.registry import shared
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Local sentence-transformers model used when the package is installed; override with LEAD_EMBEDDING_MODEL
+DEFAULT_EMBEDDING_MODEL = os.getenv("LEAD_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
+# Cosine similarity above which two leads are the same person; override with LEAD_DEDUP_SIMILARITY
+SIMILARITY_OVERRIDE = os.getenv("LEAD_DEDUP_SIMILARITY")
+
+# Leads embedded and matched per step; bounds the in-batch similarity matrix
+MERGE_BATCH = 1024
+
+def _split_links(links) -> List[str]:
+    if isinstance(links, (list, tuple)):
+        return [str(link).strip() for link in links if str(link).strip()]
+    return [link.strip() for link in str(links or "").split(",") if link.strip()]
+
+def lead_text(record: Mapping) -> str:
+    """Username, bio and links of a lead as one normalized string to embed."""
+    # Schemes and "www." are shared by every link and would only add noise
+    links = [re.sub(r"^[a-z]+://(?:www\.)?", "", link.lower()) for link in _split_links(record.get("Links"))]
+    parts = [str(record.get("Username") or ""), str(record.get("Bio") or "")] + links
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", " ".join(parts).lower()).split())
+
+def has_identity(record: Mapping) -> bool:
+    """Only leads with a bio or links carry enough signal to match on; bare handles like "John" would collide."""
+    return bool(str(record.get("Bio") or "").strip() or _split_links(record.get("Links")))
+
+class HashingEmbedder:
+    """Dependency-free fallback: hashed character trigram counts, L2-normalized.
+
+    Catches copy-pasted bios and handle variants ("john_smith" / "John Smith")
+    but not paraphrases.
+    """
+
+    name = "hashing-trigram-512"
+    dim = 512
+    # Short generic bios ("Software engineer") with similar names score ~0.88
+    default_threshold = 0.9
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            padded = f"  {text} "
+            for start in range(len(padded) - 2):
+                vectors[row, zlib.crc32(padded[start:start + 3].encode("utf-8")) % self.dim] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+class SentenceEmbedder:
+    """Local sentence-transformers model on CPU."""
+
+    default_threshold = 0.93
+
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL):
+        from sentence_transformers import SentenceTransformer
+        self.name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        return self.model.encode(list(texts), batch_size=64, normalize_embeddings=True,
+                                 convert_to_numpy=True, show_progress_bar=False).astype(np.float32)
+
+def get_embedder():
+    """Process-wide embedder: the local model when sentence-transformers is installed, hashed trigrams otherwise."""
+    def create():
+        try:
+            return SentenceEmbedder()
+        except ImportError:
+            logger.info("sentence-transformers not installed; using hashed trigram embeddings for lead dedup")
+            return HashingEmbedder()
+    return shared(("lead_embedder", DEFAULT_EMBEDDING_MODEL), create)
+
+class VectorIndex:
+    """Cosine nearest-neighbor index over unit vectors.
+
+    Uses an hnswlib HNSW graph when installed (approximate, sub-linear
+    queries, incremental inserts); otherwise falls back to exact search with
+    numpy over a preallocated matrix that grows geometrically, which is fine
+    up to a few hundred thousand leads.
+    """
+
+    def __init__(self, dim: int, capacity: int = 10000):
+        self.dim = dim
+        self.count = 0
+        try:
+            import hnswlib
+            self._hnsw = hnswlib.Index(space="cosine", dim=dim)
+            self._hnsw.init_index(max_elements=capacity, ef_construction=200, M=16)
+            self._hnsw.set_ef(64)
+        except ImportError:
+            self._hnsw = None
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+
+    @property
+    def approximate(self) -> bool:
+        return self._hnsw is not None
+
+    def add(self, vectors: np.ndarray) -> None:
+        if not len(vectors):
+            return
+        needed = self.count + len(vectors)
+        if self._hnsw is not None:
+            if needed > self._hnsw.get_max_elements():
+                self._hnsw.resize_index(max(needed, 2 * self._hnsw.get_max_elements()))
+            self._hnsw.add_items(vectors, np.arange(self.count, needed))
+        else:
+            if needed > len(self._vectors):
+                # Double the capacity so appends stay amortized O(batch) instead of copying the index every page
+                grown = np.zeros((max(needed, 2 * len(self._vectors), MERGE_BATCH), self.dim), dtype=np.float32)
+                grown[:self.count] = self._vectors[:self.count]
+                self._vectors = grown
+            self._vectors[self.count:needed] = vectors
+        self.count = needed
+
+    def nearest(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Label and cosine similarity of the nearest indexed vector per row (-1 / -inf when empty)."""
+        if not self.count or not len(vectors):
+            return np.full(len(vectors), -1), np.full(len(vectors), -np.inf)
+        if self._hnsw is not None:
+            labels, distances = self._hnsw.knn_query(vectors, k=1)
+            return labels[:, 0].astype(np.int64), 1.0 - distances[:, 0]
+        similarities = vectors @ self._vectors[:self.count].T
+        best = similarities.argmax(axis=1)
+        return best, similarities[np.arange(len(vectors)), best]
+
+def merge_lead_records(records: Sequence[Mapping]) -> Mapping:
+    """Collapse near-duplicate leads into the first one: longest bio, most upvotes, union of links."""
+    base = records[0]
+    if len(records) == 1:
+        return base
+    bio = max((str(record.get("Bio") or "") for record in records), key=len)
+    upvotes = max((record.get("Upvotes") for record in records), key=lambda value: _to_number(value))
+    links = list(dict.fromkeys(link for record in records for link in _split_links(record.get("Links"))))
+    if isinstance(base, LeadRecord):
+        return LeadRecord(base.website_url, base.username, bio, base.post_type, base.timestamp, upvotes, links)
+    return {**base, "Bio": bio, "Upvotes": upvotes, "Links": ", ".join(links)}
+
+def _to_number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("-inf")
+
+class LeadDeduplicator:
+    """Merges semantic near-duplicate leads (same person, different handle or copy-pasted bio) within one run.
+
+    Leads are embedded from username + bio + links and matched against an
+    incremental nearest-neighbor index of the leads merged so far. Within a
+    batch, duplicates merge into the first occurrence. A lead matching one from
+    an earlier batch is dropped: its canonical lead was already emitted, and
+    streamed output can't be rewritten. Leads repeated from earlier runs are
+    filtered by the LeadIndex instead.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, embedder=None):
+        self.embedder = embedder or get_embedder()
+        self.threshold = float(SIMILARITY_OVERRIDE) if threshold is None and SIMILARITY_OVERRIDE else threshold
+        if self.threshold is None:
+            self.threshold = self.embedder.default_threshold
+        self.merged = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self.index = VectorIndex(self.embedder.dim)
+
+    def merge(self, records: Sequence[Mapping]) -> List[Mapping]:
+        """Return one canonical lead per near-duplicate group, in first-seen order."""
+        output: List[Mapping] = []
+        for start in range(0, len(records), MERGE_BATCH):
+            output.extend(self._merge_batch(records[start:start + MERGE_BATCH]))
+        return output
+
+    def _merge_batch(self, records: Sequence[Mapping]) -> List[Mapping]:
+        candidates = [i for i, record in enumerate(records) if has_identity(record)]
+        if not candidates:
+            return list(records)
+        vectors = self.embedder.encode([lead_text(records[i]) for i in candidates])
+
+        with self._lock:
+            _, seen_similarity = self.index.nearest(vectors)
+            in_batch = vectors @ vectors.T
+            group_of = {}
+            canonical_rows: List[int] = []
+            drop = set()
+            for row, i in enumerate(candidates):
+                if seen_similarity[row] >= self.threshold:
+                    drop.add(i)
+                    continue
+                if canonical_rows:
+                    similarities = in_batch[row, canonical_rows]
+                    best = int(similarities.argmax())
+                    if similarities[best] >= self.threshold:
+                        group_of[i] = candidates[canonical_rows[best]]
+                        continue
+                canonical_rows.append(row)
+            self.index.add(vectors)
+
+        groups = {}
+        for i, record in enumerate(records):
+            if i in drop:
+                continue
+            groups.setdefault(group_of.get(i, i), []).append(record)
+        self.dropped += len(drop)
+        self.merged += len(group_of)
+        if drop or group_of:
+            logger.info(f"Lead dedup: merged {len(group_of)} near-duplicates within the batch, "
+                        f"dropped {len(drop)} already emitted")
+        return [merge_lead_records(group) for group in groups.values()]
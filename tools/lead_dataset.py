@@ -0,0 +1,101 @@
+import os
+import re
+import uuid
+from datetime import datetime
+from typing import Iterable, List, Optional
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATASET_DIR = "lead_generation_output/leads_dataset"
+
+# Fixed schema: the flattened QuoraUserInteractionSchema fields plus the qualification fields
+LEAD_SCHEMA = pa.schema([
+    ("Website URL", pa.string()),
+    ("Username", pa.string()),
+    ("Bio", pa.string()),
+    ("Post Type", pa.string()),
+    ("Timestamp", pa.string()),
+    ("Upvotes", pa.int64()),
+    ("Links", pa.string()),
+    ("Platform", pa.string()),
+    ("Qualification Score", pa.float64()),
+    ("Priority", pa.string()),
+    ("Notes", pa.string()),
+    ("Recommended Approach", pa.string()),
+])
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("run_date", pa.string()), ("query", pa.string())]),
+    flavor="hive"
+)
+
+def query_slug(query: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", query.lower()).strip("_") or "unknown"
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+def _to_float(value) -> Optional[float]:
+    if isinstance(value, str):
+        # LLM scores sometimes arrive as "7/10" or "7 - high"
+        match = re.match(r"\s*(-?\d+(?:\.\d+)?)", value)
+        return float(match.group(1)) if match else None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _to_str(value) -> Optional[str]:
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value)
+    return str(value)
+
+def records_to_table(records: Iterable[dict]) -> pa.Table:
+    """Convert lead records into an Arrow table with the fixed lead schema, coercing types."""
+    converters = {pa.int64(): _to_int, pa.float64(): _to_float, pa.string(): _to_str}
+    columns = {field.name: [] for field in LEAD_SCHEMA}
+    for record in records:
+        for field in LEAD_SCHEMA:
+            columns[field.name].append(converters[field.type](record.get(field.name)))
+    return pa.table(columns, schema=LEAD_SCHEMA)
+
+def write_leads_dataset(records: List[dict], query: str, base_dir: str = DEFAULT_DATASET_DIR) -> Optional[str]:
+    """Append a run's leads as a new Parquet file partitioned by run date and query."""
+    if not records:
+        return None
+    table = records_to_table(records)
+    partition_dir = os.path.join(base_dir, f"run_date={datetime.now().strftime('%Y-%m-%d')}", f"query={query_slug(query)}")
+    os.makedirs(partition_dir, exist_ok=True)
+    path = os.path.join(partition_dir, f"part-{datetime.now().strftime('%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet")
+    pq.write_table(table, path)
+    logger.info(f"Appended {table.num_rows} leads to dataset: {path}")
+    return path
+
+def read_leads_dataset(columns: Optional[List[str]] = None, base_dir: str = DEFAULT_DATASET_DIR,
+                       run_date: Optional[str] = None, query: Optional[str] = None,
+                       files: Optional[List[str]] = None):
+    """Load leads as a pandas DataFrame, reading only the requested columns and partitions.
+
+    Pass ``files`` to read just those part files under ``base_dir``.
+    """
+    if not os.path.isdir(base_dir):
+        return records_to_table([]).select(columns or LEAD_SCHEMA.names).to_pandas()
+    dataset = ds.dataset(files or base_dir, format="parquet", partitioning=PARTITIONING, partition_base_dir=base_dir)
+    conditions = []
+    if run_date:
+        conditions.append(ds.field("run_date") == run_date)
+    if query:
+        conditions.append(ds.field("query") == query_slug(query))
+    flt = None
+    for condition in conditions:
+        flt = condition if flt is None else flt & condition
+    return dataset.to_table(columns=columns, filter=flt).to_pandas()
@@ -0,0 +1,127 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+from tools.pending_writes import PendingWrites
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = "lead_generation_cache/lead_index.sqlite"
+
+def lead_key(username: str, website_url: str) -> Tuple[str, str]:
+    """Normalize the identity of a lead to (username, url) for lookups."""
+    username = " ".join((username or "").lower().split())
+    url = (website_url or "").strip().lower().split("#")[0].split("?")[0].rstrip("/")
+    return username, url
+
+def bio_hash(bio: str) -> str:
+    normalized = " ".join((bio or "").lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+class LeadIndex:
+    """Persistent index of leads already surfaced by earlier runs.
+
+    Leads are keyed by normalized username + website URL (a unique primary key,
+    so lookups stay O(log n) at millions of rows) and store a hash of the bio so
+    changed profiles are surfaced again.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS leads (
+                username TEXT NOT NULL,
+                url TEXT NOT NULL,
+                bio_hash TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (username, url)
+            ) WITHOUT ROWID"""
+        )
+        self._conn.commit()
+
+    def _new_records(self, records: Iterable[dict], staged: Dict[Tuple[str, str], str]) -> List[dict]:
+        """Records that are new or changed against the index and ``staged``, which they are added to."""
+        new_records = []
+        with self._lock:
+            for record in records:
+                key = lead_key(record.get("Username", ""), record.get("Website URL", ""))
+                digest = bio_hash(record.get("Bio", ""))
+                known = staged.get(key)
+                if known is None:
+                    row = self._conn.execute(
+                        "SELECT bio_hash FROM leads WHERE username = ? AND url = ?", key
+                    ).fetchone()
+                    known = row[0] if row else None
+                if known != digest:
+                    new_records.append(record)
+                staged[key] = digest
+        return new_records
+
+    def record(self, staged: Dict[Tuple[str, str], str]) -> None:
+        """Record leads as seen, as (username, url) -> bio hash, in one transaction."""
+        if not staged:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                """INSERT INTO leads (username, url, bio_hash, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (username, url) DO UPDATE SET bio_hash = excluded.bio_hash, last_seen = excluded.last_seen""",
+                [(username, url, digest, now, now) for (username, url), digest in staged.items()]
+            )
+            self._conn.commit()
+
+    def filter_new(self, records: Iterable[dict]) -> List[dict]:
+        """Return only flattened lead records that are new or changed, recording the page in one transaction."""
+        records = list(records)
+        staged: Dict[Tuple[str, str], str] = {}
+        new_records = self._new_records(records, staged)
+        self.record(staged)
+        if len(new_records) < len(records):
+            logger.info(f"Skipped {len(records) - len(new_records)} leads already surfaced by earlier runs")
+        return new_records
+
+    def deferred(self, pending: PendingWrites) -> "DeferredLeadIndex":
+        """View that filters like this index but only records leads when ``pending`` is committed."""
+        return DeferredLeadIndex(self, pending)
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM leads").fetchone()
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class DeferredLeadIndex:
+    """LeadIndex view for one run: leads are staged until the run's output is committed."""
+
+    def __init__(self, index: LeadIndex, pending: PendingWrites):
+        self.index = index
+        self._staged: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+        pending.on_commit(self._flush)
+
+    def filter_new(self, records: Iterable[dict]) -> List[dict]:
+        records = list(records)
+        with self._lock:
+            new_records = self.index._new_records(records, self._staged)
+        if len(new_records) < len(records):
+            logger.info(f"Skipped {len(records) - len(new_records)} leads already surfaced by earlier runs")
+        return new_records
+
+    def _flush(self) -> None:
+        with self._lock:
+            staged, self._staged = self._staged, {}
+        self.index.record(staged)
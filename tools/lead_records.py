@@ -0,0 +1,85 @@
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterable, List
+
+LEAD_FIELDNAMES = ["Website URL", "Username", "Bio", "Post Type", "Timestamp", "Upvotes", "Links"]
+
+# Column name -> slot name
+_FIELD_SLOTS = {
+    "Website URL": "website_url",
+    "Username": "username",
+    "Bio": "bio",
+    "Post Type": "post_type",
+    "Timestamp": "timestamp",
+    "Upvotes": "upvotes",
+    "Links": "links",
+}
+
+class LeadRecord(Mapping):
+    """A flattened lead, stored in slots instead of a per-row dict.
+
+    Read-only mapping over LEAD_FIELDNAMES, so CSV/Sheets writers, the lead
+    index, pandas and ``{**record}`` all accept it like the old dicts. URLs,
+    usernames and post types are interned since they repeat across leads,
+    and links stay a tuple until a writer asks for the "Links" column.
+    """
+
+    __slots__ = ("website_url", "username", "bio", "post_type", "timestamp", "upvotes", "links")
+
+    def __init__(self, website_url: str, username: str = "", bio: str = "", post_type: str = "",
+                 timestamp: str = "", upvotes: int = 0, links: Iterable[str] = ()):
+        self.website_url = sys.intern(website_url)
+        self.username = sys.intern(username or "")
+        self.bio = bio or ""
+        self.post_type = sys.intern(post_type or "")
+        self.timestamp = timestamp or ""
+        self.upvotes = upvotes
+        self.links = tuple(links or ())
+
+    @classmethod
+    def from_interaction(cls, website_url: str, interaction: dict) -> "LeadRecord":
+        return cls(
+            website_url,
+            interaction.get("username", ""),
+            interaction.get("bio", ""),
+            interaction.get("post_type", ""),
+            interaction.get("timestamp", ""),
+            interaction.get("upvotes", 0),
+            interaction.get("links", ()),
+        )
+
+    def __getitem__(self, field: str):
+        try:
+            slot = _FIELD_SLOTS[field]
+        except KeyError:
+            raise KeyError(field) from None
+        if slot == "links":
+            return ", ".join(self.links)
+        return getattr(self, slot)
+
+    def __iter__(self):
+        return iter(LEAD_FIELDNAMES)
+
+    def __len__(self) -> int:
+        return len(LEAD_FIELDNAMES)
+
+    def row(self) -> list:
+        """Values in LEAD_FIELDNAMES order, ready for a CSV or sheet row."""
+        return [self.website_url, self.username, self.bio, self.post_type, self.timestamp, self.upvotes, ", ".join(self.links)]
+
+    def __repr__(self) -> str:
+        return f"LeadRecord({self.username!r} @ {self.website_url!r})"
+
+def lead_row(record: Mapping) -> list:
+    """Values in LEAD_FIELDNAMES order for a LeadRecord or a plain lead dict."""
+    if isinstance(record, LeadRecord):
+        return record.row()
+    return [record.get(field, "") for field in LEAD_FIELDNAMES]
+
+def lead_columns(records: Iterable[Mapping]) -> Dict[str, List]:
+    """Column-oriented view of lead records, e.g. for a DataFrame or Arrow table."""
+    columns: Dict[str, List] = {field: [] for field in LEAD_FIELDNAMES}
+    for record in records:
+        for field in LEAD_FIELDNAMES:
+            columns[field].append(record.get(field, ""))
+    return columns
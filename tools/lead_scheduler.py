@@ -0,0 +1,134 @@
+import math
+import os
+from typing import Iterable, List, Optional, Set, Tuple
+from tools.lead_index import lead_key
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Leads wanted per run; override with LEAD_TARGET_LEADS
+DEFAULT_TARGET_LEADS = int(os.getenv("LEAD_TARGET_LEADS", "25"))
+
+# Extract calls allowed per run (the dominant API cost); override with LEAD_MAX_EXTRACTS
+DEFAULT_MAX_EXTRACTS = int(os.getenv("LEAD_MAX_EXTRACTS", "20"))
+
+# Keep going while a batch yields at least this many unique new leads per extracted page; override with LEAD_MIN_YIELD
+DEFAULT_MIN_YIELD = float(os.getenv("LEAD_MIN_YIELD", "0.5"))
+
+# Firecrawl search returns at most this many results per query
+MAX_SEARCH_DEPTH = 100
+
+class YieldScheduler:
+    """Decides how many URLs to search for and extract next, based on the lead yield so far.
+
+    URLs are extracted in batches of up to ``batch_size``. After each batch the
+    unique new leads per extracted page is compared against ``min_yield``, and
+    the run stops once ``target_leads`` is met, ``max_extracts`` is spent, the
+    yield drops below the threshold or search runs out of new URLs. Searches
+    page deeper (doubling the result count) only when the URL pool runs dry.
+    Only pages that were really extracted count toward the budget and the
+    yield; a thread skipped as unchanged just makes room for the next URL.
+    """
+
+    def __init__(self, target_leads: int = DEFAULT_TARGET_LEADS, max_extracts: int = DEFAULT_MAX_EXTRACTS,
+                 min_yield: float = DEFAULT_MIN_YIELD, batch_size: int = 4):
+        self.target_leads = max(1, target_leads)
+        self.max_extracts = max(0, max_extracts)
+        self.min_yield = min_yield
+        self.batch_size = max(1, batch_size)
+        self.extracts = 0
+        self.leads = 0
+        self.searches = 0
+        self.search_depth = 0
+        self.last_yield: Optional[float] = None
+        self.stop_reason: Optional[str] = None
+        self.extracted_urls: List[str] = []
+        self._pool: List[str] = []
+        self._seen_urls: Set[str] = set()
+        self._seen_leads: Set[Tuple[str, str]] = set()
+        self._batch_leads = 0
+        self._exhausted = False
+
+    def next_batch_size(self) -> int:
+        """Number of URLs to extract next; 0 means stop (see ``stop_reason``)."""
+        if self.stop_reason:
+            return 0
+        if self.leads >= self.target_leads:
+            return self._stop("target met")
+        if self.extracts >= self.max_extracts:
+            return self._stop("extract budget spent")
+        if self.last_yield is not None and self.last_yield < self.min_yield:
+            return self._stop(f"yield {self.last_yield:.2f} leads/page below {self.min_yield}")
+        if not self._pool and self._exhausted:
+            return self._stop("search exhausted")
+        size = min(self.batch_size, self.max_extracts - self.extracts)
+        if self.last_yield:
+            # Don't extract more pages than the recent yield says are needed to reach the target
+            size = min(size, math.ceil((self.target_leads - self.leads) / self.last_yield))
+        return max(1, size)
+
+    def needs_search(self, batch_size: int) -> bool:
+        return len(self._pool) < batch_size and not self._exhausted
+
+    def next_search_depth(self) -> int:
+        """Result count for the next search: enough for the URLs used so far plus a batch, at least double the last."""
+        return min(MAX_SEARCH_DEPTH, max(self.batch_size, 2 * self.search_depth, len(self._seen_urls) + self.batch_size))
+
+    def add_search_results(self, urls: Iterable[str], depth: int) -> int:
+        """Queue URLs not seen before. Returns how many were new."""
+        self.searches += 1
+        fresh = 0
+        for url in urls:
+            if url not in self._seen_urls:
+                self._seen_urls.add(url)
+                self._pool.append(url)
+                fresh += 1
+        # Asking for more results can't help once the ceiling is hit or a deeper search found nothing new
+        if depth >= MAX_SEARCH_DEPTH or depth <= self.search_depth or not fresh:
+            self._exhausted = True
+        self.search_depth = max(self.search_depth, depth)
+        return fresh
+
+    def take(self, batch_size: int) -> List[str]:
+        batch, self._pool = self._pool[:batch_size], self._pool[batch_size:]
+        self._batch_leads = 0
+        return batch
+
+    def record_lead(self, record: dict) -> bool:
+        """Count a lead, returning False if this run already emitted it (same username and URL)."""
+        key = lead_key(record.get("Username", ""), record.get("Website URL", ""))
+        if key in self._seen_leads:
+            return False
+        self._seen_leads.add(key)
+        self.leads += 1
+        self._batch_leads += 1
+        return True
+
+    def finish_batch(self, taken: List[str], extracted: List[str]) -> None:
+        """Charge the pages of the last batch that were extracted; ``taken`` minus those were skipped as unchanged."""
+        done = set(extracted)
+        self.extracts += len(done)
+        self.extracted_urls.extend(url for url in taken if url in done)
+        skipped = len(taken) - len(done)
+        if skipped:
+            logger.info(f"{skipped} of {len(taken)} pages were unchanged and skipped without an extract")
+        if done:
+            self.last_yield = self._batch_leads / len(done)
+            logger.info(f"Batch of {len(done)} pages yielded {self._batch_leads} new leads "
+                        f"({self.leads}/{self.target_leads} leads, {self.extracts}/{self.max_extracts} extracts)")
+
+    def summary(self) -> dict:
+        return {
+            "leads": self.leads,
+            "target_leads": self.target_leads,
+            "extracts": self.extracts,
+            "max_extracts": self.max_extracts,
+            "searches": self.searches,
+            "search_depth": self.search_depth,
+            "stop_reason": self.stop_reason,
+        }
+
+    def _stop(self, reason: str) -> int:
+        self.stop_reason = reason
+        logger.info(f"Stopping lead collection: {reason}")
+        return 0
@@ -0,0 +1,119 @@
+import os
+from datetime import datetime, timezone
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+
+# Bio keywords that suggest decision-making authority
+AUTHORITY_PATTERN = r"\b(?:founder|co-founder|ceo|cto|coo|cmo|owner|director|head of|vp|vice president|manager|partner|entrepreneur|consultant|agency|startup)\b"
+
+# Question-intent keywords, matched against the Quora thread slug in the URL
+INTENT_PATTERN = r"(?:best|recommend|looking-for|looking for|alternative|which|need|hire|hiring|how-do-i|how-can-i|how-to-find|tool|software|service|vs)"
+
+# Relative timestamps such as "Updated 2y", "3 months ago", "5d"
+RELATIVE_AGE_PATTERN = r"(?P<n>\d+)\s*(?P<unit>y|yr|year|mo|month|w|wk|week|d|day|h|hr|hour|m|min|minute)s?\b"
+UNIT_DAYS = {
+    "y": 365.0, "yr": 365.0, "year": 365.0,
+    "mo": 30.0, "month": 30.0,
+    "w": 7.0, "wk": 7.0, "week": 7.0,
+    "d": 1.0, "day": 1.0,
+    "h": 1 / 24, "hr": 1 / 24, "hour": 1 / 24,
+    "m": 1 / 1440, "min": 1 / 1440, "minute": 1 / 1440,
+}
+
+WEIGHTS = {
+    "question": 0.25,
+    "intent": 0.20,
+    "authority": 0.20,
+    "engagement": 0.15,
+    "recency": 0.15,
+    "links": 0.05,
+}
+
+HIGH_THRESHOLD = 7.0
+MEDIUM_THRESHOLD = 4.5
+
+# Leads closest to a priority threshold that get a second look from the LLM; override with LEAD_LLM_REVIEW_COUNT
+DEFAULT_REVIEW_COUNT = int(os.getenv("LEAD_LLM_REVIEW_COUNT", "10"))
+
+# Lead fields the score is computed from
+SCORING_COLUMNS = ["Website URL", "Post Type", "Bio", "Links", "Upvotes", "Timestamp"]
+
+NOTE_LABELS = ["asked a question", "buying intent", "decision-maker bio", "high engagement", "recent"]
+
+def _text(df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in df.columns:
+        return pd.Series("", index=df.index)
+    return df[column].fillna("").astype(str)
+
+def _per_unique(values: pd.Series, fn) -> np.ndarray:
+    """Apply a Series -> Series string function once per distinct value and broadcast back.
+
+    URLs, post types and timestamps repeat heavily across leads, so this avoids
+    running regexes over every row.
+    """
+    codes, uniques = pd.factorize(values)
+    return np.asarray(fn(pd.Series(uniques, dtype=object)))[codes]
+
+def lead_age_days(timestamps: pd.Series, now: Optional[datetime] = None) -> np.ndarray:
+    """Age in days from absolute ISO timestamps or relative ones ("2y", "3 months ago"). NaN if unknown."""
+    now = pd.Timestamp(now or datetime.now(timezone.utc))
+
+    def age_of(unique: pd.Series) -> np.ndarray:
+        parsed = pd.to_datetime(unique, errors="coerce", utc=True, format="ISO8601")
+        age = (now - parsed).dt.total_seconds().to_numpy() / 86400.0
+        relative = unique.str.lower().str.extract(RELATIVE_AGE_PATTERN)
+        relative_age = pd.to_numeric(relative["n"], errors="coerce").to_numpy() * relative["unit"].map(UNIT_DAYS).to_numpy(dtype=float)
+        return np.where(np.isnan(age), relative_age, age)
+
+    return _per_unique(timestamps, age_of).astype(float)
+
+def score_leads(df: pd.DataFrame, now: Optional[datetime] = None) -> pd.DataFrame:
+    """Add deterministic Qualification Score (1-10), Priority and Notes columns to flattened leads.
+
+    All features are computed column-wise, so scoring scales to hundreds of
+    thousands of leads without any LLM calls.
+    """
+    df = df.copy()
+    is_question = _per_unique(_text(df, "Post Type"), lambda s: s.str.strip().str.lower().eq("question")).astype(bool)
+    intent = _per_unique(_text(df, "Website URL"), lambda s: s.str.contains(INTENT_PATTERN, case=False, regex=True)).astype(bool)
+    authority = _per_unique(_text(df, "Bio"), lambda s: s.str.contains(AUTHORITY_PATTERN, case=False, regex=True)).astype(bool)
+    has_links = _per_unique(_text(df, "Links"), lambda s: s.str.strip().ne("")).astype(bool)
+    upvotes = pd.to_numeric(df["Upvotes"], errors="coerce").fillna(0).clip(lower=0).to_numpy() if "Upvotes" in df.columns else np.zeros(len(df))
+    engagement = np.minimum(np.log1p(upvotes) / np.log1p(1000), 1.0)
+    age = lead_age_days(_text(df, "Timestamp"), now)
+    recency = np.where(np.isnan(age), 0.5, np.exp(-np.clip(np.nan_to_num(age), 0, None) / 365.0))
+
+    total = (
+        WEIGHTS["question"] * is_question
+        + WEIGHTS["intent"] * intent
+        + WEIGHTS["authority"] * authority
+        + WEIGHTS["engagement"] * engagement
+        + WEIGHTS["recency"] * recency
+        + WEIGHTS["links"] * has_links
+    )
+    score = np.round(1 + 9 * total, 1)
+    df["Qualification Score"] = score
+    df["Priority"] = np.select([score >= HIGH_THRESHOLD, score >= MEDIUM_THRESHOLD], ["High", "Medium"], "Low")
+
+    # Encode the note flags as a bitmask and render each of the 32 combinations once
+    flags = (is_question, intent, authority, engagement >= 0.5, recency >= 0.75)
+    mask = sum(flag.astype(np.int64) << bit for bit, flag in enumerate(flags))
+    rendered = np.array([
+        "; ".join(label for bit, label in enumerate(NOTE_LABELS) if combo >> bit & 1)
+        for combo in range(1 << len(NOTE_LABELS))
+    ], dtype=object)
+    df["Notes"] = rendered[mask]
+    return df
+
+def select_borderline(df: pd.DataFrame, n: int) -> pd.Index:
+    """Index of the ``n`` scored leads closest to a priority threshold, worth a second look by the LLM."""
+    score = pd.to_numeric(df["Qualification Score"], errors="coerce")
+    distance = np.minimum((score - HIGH_THRESHOLD).abs(), (score - MEDIUM_THRESHOLD).abs())
+    return distance.nsmallest(n).index
+
+def score_records(records: List[dict], now: Optional[datetime] = None) -> List[dict]:
+    """Score a list of flattened lead dicts and return them with the qualification fields added."""
+    if not records:
+        return []
+    return score_leads(pd.DataFrame(records), now).to_dict("records")
@@ -0,0 +1,122 @@
+import contextvars
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, TypeVar
+from tools.run_metrics import stage
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Prompt tokens of lead data per LLM call; override with LEAD_LLM_CHUNK_TOKENS
+DEFAULT_TOKEN_BUDGET = int(os.getenv("LEAD_LLM_CHUNK_TOKENS", "6000"))
+
+# LLM calls in flight at once; override with LEAD_LLM_CONCURRENCY
+DEFAULT_CONCURRENCY = int(os.getenv("LEAD_LLM_CONCURRENCY", "4"))
+
+# Added to every record sent to the model, so replies merge back by id even if rows are dropped or reordered
+ROW_ID_FIELD = "Row ID"
+
+_encoding = None
+
+def estimate_tokens(text: str) -> int:
+    """Count tokens with tiktoken when it is installed, otherwise estimate ~4 characters per token."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+def chunk_by_tokens(items: Sequence[T], token_budget: int = DEFAULT_TOKEN_BUDGET,
+                    serialize: Callable[[T], str] = json.dumps) -> List[List[T]]:
+    """Split items into consecutive chunks whose serialized size stays within ``token_budget``.
+
+    Order is preserved. An item larger than the budget on its own gets a chunk
+    to itself rather than being dropped.
+    """
+    chunks: List[List[T]] = []
+    current: List[T] = []
+    used = 0
+    for item in items:
+        tokens = estimate_tokens(serialize(item))
+        if current and used + tokens > token_budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+def parse_json_array(text) -> Optional[list]:
+    """Pull a JSON array out of an LLM reply, tolerating code fences and surrounding prose."""
+    if isinstance(text, list):
+        return text
+    text = str(getattr(text, "raw", text))
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end <= start:
+        return None
+    try:
+        parsed = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, list) else None
+
+def _row_id(record) -> Optional[int]:
+    try:
+        return int(record.get(ROW_ID_FIELD))
+    except (TypeError, ValueError):
+        return None
+
+def run_in_chunks(items: List[dict], process_chunk: Callable[[List[dict]], Optional[list]], stage_name: str,
+                  token_budget: int = DEFAULT_TOKEN_BUDGET, max_concurrency: int = DEFAULT_CONCURRENCY) -> List[dict]:
+    """Run ``process_chunk`` over token-budgeted chunks of ``items`` concurrently and merge the results in order.
+
+    Each record is sent with a ``ROW_ID_FIELD`` and results are merged back by
+    that id, not by position. A record the reply drops, or a chunk that fails,
+    keeps its input values, so one bad LLM reply never loses or mixes up leads.
+    """
+    if not items:
+        return []
+    chunks = chunk_by_tokens([{ROW_ID_FIELD: i, **item} for i, item in enumerate(items)], token_budget)
+    logger.info(f"Running {stage_name} over {len(items)} records in {len(chunks)} chunks ({max_concurrency} at a time)")
+
+    def run_chunk(chunk: List[dict]) -> List[dict]:
+        originals = [items[record[ROW_ID_FIELD]] for record in chunk]
+        with stage(stage_name, items_in=len(chunk)) as span:
+            try:
+                result = process_chunk(chunk)
+            except Exception as e:
+                logger.warning(f"{stage_name} chunk of {len(chunk)} records failed, keeping them as-is: {str(e)}")
+                return originals
+            updates = {}
+            for updated in result if isinstance(result, list) else []:
+                if isinstance(updated, dict):
+                    updates.setdefault(_row_id(updated), updated)
+            merged = []
+            for record, original in zip(chunk, originals):
+                updated = updates.get(record[ROW_ID_FIELD])
+                # Keep any original field the model left out
+                merged.append({**original, **{k: v for k, v in updated.items() if k != ROW_ID_FIELD}}
+                              if updated is not None else original)
+            span.items_out = sum(record[ROW_ID_FIELD] in updates for record in chunk)
+            if span.items_out < len(chunk):
+                logger.warning(f"{stage_name} chunk returned {span.items_out} of {len(chunk)} records, "
+                               f"keeping the missing ones as-is")
+            return merged
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(chunks)))) as executor:
+        # map() yields in submission order, which is what keeps the merge ordered
+        results = executor.map(lambda chunk: contextvars.copy_context().run(run_chunk, chunk), chunks)
+        return [record for chunk_result in results for record in chunk_result]
@@ -0,0 +1,30 @@
+import threading
+from typing import Callable, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PendingWrites:
+    """Store updates from one run, held back until the output holding its leads is committed.
+
+    The lead index and thread state only learn about a lead once
+    the checkpoint or CSV it was written to is complete, so a crashed run that
+    is resumed doesn't filter out leads it never wrote. Each store's deferred
+    view registers a flush here and writes everything it staged in one
+    transaction on ``commit``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flushes: List[Callable[[], None]] = []
+
+    def on_commit(self, flush: Callable[[], None]) -> None:
+        with self._lock:
+            self._flushes.append(flush)
+
+    def commit(self) -> None:
+        with self._lock:
+            flushes, self._flushes = self._flushes, []
+        for flush in flushes:
+            flush()
+        logger.info(f"Committed deferred updates to {len(flushes)} stores")
@@ -1,8 +1,9 @@
 from crewai.tools import BaseTool
-from typing import Type
+from typing import List, Optional, Type
 from pydantic import BaseModel, Field
-import requests
 import os
+from tools.search_client import get_search_client
+from tools.search_results import SearchResult, result_from_dict, results_to_json
 
 class QuoraSearchInput(BaseModel):
     query: str = Field(..., description="Search query for finding relevant Quora discussions")
@@ -10,41 +11,46 @@ class QuoraSearchInput(BaseModel):
 
 class QuoraSearchTool(BaseTool):
     name: str = "Quora Search Tool"
-    description: str = "Search for relevant discussions and users on Quora"
+    description: str = (
+        "Search for relevant discussions and users on Quora. "
+        "Returns a JSON array of {url, title, snippet, platform}."
+    )
     args_schema: Type[BaseModel] = QuoraSearchInput
 
     def _run(self, query: str, num_results: int = 5) -> str:
-        # Using Firecrawl for Quora search
-        url = "https://api.firecrawl.dev/v1/search"
-        headers = {
-            "Authorization": f"Bearer {os.getenv('FIRECRAWL_API_KEY')}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "query": f"site:quora.com {query}",
-            "limit": num_results,
-            "lang": "en",
-            "location": "United States",
-            "timeout": 60000,
-        }
+        # Using the shared Firecrawl search client for Quora search
+        try:
+            results = quora_search_results(query, num_results)
+            if results is not None:
+                return results_to_json(results)
+        except Exception as e:
+            return f"Error searching Quora: {str(e)}"
         
+        return "No results found"
+
+    async def _arun(self, query: str, num_results: int = 5) -> str:
+        """Async counterpart of _run over the process-wide pooled HTTP/2 Firecrawl client."""
         try:
-            response = requests.post(url, json=payload, headers=headers)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("success"):
-                    results = data.get("data", [])
-                    formatted_results = []
-                    for idx, result in enumerate(results):
-                        formatted_results.append(f"""
-                        Result {idx + 1}:
-                        Title: {result.get('title')}
-                        URL: {result.get('url')}
-                        Snippet: {result.get('snippet')}
-                        """)
-                    return "\n".join(formatted_results)
+            results = await quora_search_results_async(query, num_results)
+            if results is not None:
+                return results_to_json(results)
         except Exception as e:
             return f"Error searching Quora: {str(e)}"
         
-        return "No results found"
\ No newline at end of file
+        return "No results found"
+
+def quora_search_results(query: str, num_results: int = 5) -> Optional[List[SearchResult]]:
+    """Structured Quora results, for the tool and for code paths that skip the agent. None if the search failed."""
+    results = get_search_client().search(
+        f"site:quora.com {query}",
+        os.getenv('FIRECRAWL_API_KEY'),
+        limit=num_results
+    )
+    return None if results is None else [result_from_dict(result) for result in results]
+
+async def quora_search_results_async(query: str, num_results: int = 5) -> Optional[List[SearchResult]]:
+    from tools.async_clients import AsyncFirecrawlClient, get_async_client
+
+    client = get_async_client(AsyncFirecrawlClient, os.getenv('FIRECRAWL_API_KEY'))
+    results = await client.search(f"site:quora.com {query}", limit=num_results)
+    return None if results is None else [result_from_dict(result) for result in results]
@@ -0,0 +1,194 @@
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+from tools.run_metrics import record_api_call
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+# A status code named as such in an error message, e.g. "Status code 429", "status=503" or "HTTP/1.1 502"
+STATUS_IN_MESSAGE = re.compile(r"\b(?:status(?:[ _-]?code)?|http(?:/\d(?:\.\d)?)?)\W{0,3}(\d{3})\b", re.IGNORECASE)
+
+# Requests per minute per provider; override with e.g. FIRECRAWL_RPM=100
+DEFAULT_RPM = {
+    "firecrawl": 100,
+    "exa": 60,
+    "openai": 500,
+    "composio": 60,
+}
+
+class TokenBucket:
+    """Thread-safe token bucket refilling at ``rate`` tokens per second up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until ``tokens`` are available and take them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        """Like acquire(), but waits without blocking the event loop."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            await asyncio.sleep(wait)
+
+class RetryBudget:
+    """Caps retries to a fraction of successful calls so an outage doesn't multiply traffic."""
+
+    def __init__(self, max_tokens: float = 10.0, refill_per_success: float = 0.1):
+        self.max_tokens = max_tokens
+        self.refill_per_success = refill_per_success
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.refill_per_success)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+class ProviderLimiter:
+    """Rate limit, retry policy and retry budget for one outbound API provider."""
+
+    def __init__(self, name: str, rpm: float, max_retries: int = 4, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.name = name
+        self.bucket = TokenBucket(rate=rpm / 60.0, capacity=max(1.0, rpm / 60.0 * 5))
+        self.budget = RetryBudget()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for the given retry attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Call ``fn`` under the rate limit, retrying 429/5xx responses and transient errors."""
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                record_api_call()
+                if not is_retryable_error(e) or not self._should_retry(attempt):
+                    raise
+                logger.warning(f"{self.name} call failed ({str(e)}), retrying (attempt {attempt + 1}/{self.max_retries})")
+            else:
+                record_api_call(result)
+                status = getattr(result, "status_code", None)
+                if status not in RETRYABLE_STATUS_CODES:
+                    self.budget.record_success()
+                    return result
+                if not self._should_retry(attempt):
+                    return result
+                logger.warning(f"{self.name} returned status {status}, retrying (attempt {attempt + 1}/{self.max_retries})")
+            time.sleep(self.backoff(attempt))
+            attempt += 1
+
+    async def call_async(self, fn: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """Async counterpart of call() for coroutine functions; shares the same bucket and budget."""
+        attempt = 0
+        while True:
+            await self.bucket.acquire_async()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                record_api_call()
+                if not is_retryable_error(e) or not self._should_retry(attempt):
+                    raise
+                logger.warning(f"{self.name} call failed ({str(e)}), retrying (attempt {attempt + 1}/{self.max_retries})")
+            else:
+                record_api_call(result)
+                status = getattr(result, "status_code", None)
+                if status not in RETRYABLE_STATUS_CODES:
+                    self.budget.record_success()
+                    return result
+                if not self._should_retry(attempt):
+                    return result
+                logger.warning(f"{self.name} returned status {status}, retrying (attempt {attempt + 1}/{self.max_retries})")
+            await asyncio.sleep(self.backoff(attempt))
+            attempt += 1
+
+    def _should_retry(self, attempt: int) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if not self.budget.try_spend():
+            logger.warning(f"{self.name} retry budget exhausted, not retrying")
+            return False
+        return True
+
+def error_status(error: Exception) -> Optional[int]:
+    """HTTP status of a failed call, from the SDK error or its response, else from the message."""
+    response = getattr(error, "response", None)
+    for source, attr in ((response, "status_code"), (error, "status_code"), (error, "status"), (error, "http_status")):
+        status = getattr(source, attr, None)
+        if isinstance(status, int):
+            return status
+    match = STATUS_IN_MESSAGE.search(str(error))
+    return int(match.group(1)) if match else None
+
+def is_retryable_error(error: Exception) -> bool:
+    """Whether an exception looks transient: timeouts, connection errors, 429 or 5xx."""
+    status = error_status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    name = type(error).__name__.lower()
+    if "timeout" in name or "connection" in name:
+        return True
+    return "rate limit" in str(error).lower()
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    """Return the process-wide limiter for a provider, creating it on first use."""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            rpm = float(os.getenv(f"{provider.upper()}_RPM", DEFAULT_RPM.get(provider, 60)))
+            limiter = ProviderLimiter(provider, rpm)
+            _limiters[provider] = limiter
+        return limiter
+
+def rate_limited_call(provider: str, fn: Callable[..., T], *args, **kwargs) -> T:
+    """Route an outbound API call through the provider's shared rate limiter and retry policy."""
+    return get_limiter(provider).call(fn, *args, **kwargs)
+
+async def async_rate_limited_call(provider: str, fn: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+    """Await an outbound API coroutine under the provider's shared rate limiter and retry policy."""
+    return await get_limiter(provider).call_async(fn, *args, **kwargs)
@@ -0,0 +1,32 @@
+import threading
+from typing import Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+_instances: Dict[Hashable, object] = {}
+_key_locks: Dict[Hashable, threading.Lock] = {}
+_lock = threading.Lock()
+
+def shared(key: Hashable, factory: Callable[[], T]) -> T:
+    """Return the process-wide instance for ``key``, building it with ``factory`` on first use.
+
+    Construction happens under a per-key lock, so concurrent first callers build
+    the object once while unrelated keys don't wait on each other.
+    """
+    instance = _instances.get(key)
+    if instance is not None:
+        return instance
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        instance = _instances.get(key)
+        if instance is None:
+            instance = factory()
+            _instances[key] = instance
+        return instance
+
+def clear() -> None:
+    """Drop all shared instances, e.g. after rotating API keys."""
+    with _lock:
+        _instances.clear()
+        _key_locks.clear()
@@ -0,0 +1,259 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPORT_DIR = "lead_generation_output/run_reports"
+
+_current_report: contextvars.ContextVar = contextvars.ContextVar("lead_pipeline_report", default=None)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("lead_pipeline_span", default=None)
+
+class StageStats:
+    """Aggregated measurements for every span of one stage in a run."""
+
+    __slots__ = ("calls", "duration", "max_duration", "items_in", "items_out", "api_calls", "tokens", "bytes", "errors")
+
+    def __init__(self):
+        self.calls = 0
+        self.duration = 0.0
+        self.max_duration = 0.0
+        self.items_in = 0
+        self.items_out = 0
+        self.api_calls = 0
+        self.tokens = 0
+        self.bytes = 0
+        self.errors = 0
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class Span:
+    """A single timed unit of work within a stage. Counters are merged into the run on exit."""
+
+    def __init__(self, stage: str, items_in: int = 0):
+        self.stage = stage
+        self.items_in = items_in
+        self.items_out = 0
+        self.api_calls = 0
+        self.tokens = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def record_api_call(self, tokens: int = 0, nbytes: int = 0) -> None:
+        with self._lock:
+            self.api_calls += 1
+            self.tokens += tokens
+            self.bytes += nbytes
+
+class RunReport:
+    """Per-stage timing and cost measurements for one lead pipeline run."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = datetime.now().isoformat()
+        self.stages: Dict[str, StageStats] = {}
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, span: Span, duration: float, failed: bool = False) -> None:
+        """Merge a span that was timed by the caller, e.g. work spread across a generator's lifetime."""
+        self._merge(span, duration, failed)
+
+    @contextmanager
+    def span(self, stage: str, items_in: int = 0) -> Iterator[Span]:
+        """Time a block of work; API calls made inside it (in this context) are attributed to it."""
+        span = Span(stage, items_in)
+        token = _current_span.set(span)
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield span
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            _current_span.reset(token)
+            self._merge(span, time.perf_counter() - start, failed)
+
+    def _merge(self, span: Span, duration: float, failed: bool) -> None:
+        with self._lock:
+            stats = self.stages.setdefault(span.stage, StageStats())
+            stats.calls += 1
+            stats.duration += duration
+            stats.max_duration = max(stats.max_duration, duration)
+            stats.items_in += span.items_in
+            stats.items_out += span.items_out
+            stats.api_calls += span.api_calls
+            stats.tokens += span.tokens
+            stats.bytes += span.bytes
+            stats.errors += int(failed)
+        METRICS.observe(span.stage, duration, span, failed)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            stages = {stage: stats.to_dict() for stage, stats in self.stages.items()}
+        return {
+            "run": self.name,
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "wall_time": time.perf_counter() - self._start,
+            "stages": stages,
+        }
+
+    def write_json(self, report_dir: str = DEFAULT_REPORT_DIR) -> str:
+        os.makedirs(report_dir, exist_ok=True)
+        path = os.path.join(report_dir, f"{self.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self.run_id}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        logger.info(f"Wrote run report: {path}")
+        return path
+
+@contextmanager
+def run_report(name: str) -> Iterator[RunReport]:
+    """Make a new RunReport the active report for stage() calls in this context."""
+    report = RunReport(name)
+    token = _current_report.set(report)
+    try:
+        yield report
+    finally:
+        _current_report.reset(token)
+
+@contextmanager
+def stage(name: str, items_in: int = 0) -> Iterator[Span]:
+    """Record a span on the active run report, or a throwaway span when no report is active."""
+    report = _current_report.get()
+    if report is None:
+        yield Span(name, items_in)
+        return
+    with report.span(name, items_in) as span:
+        yield span
+
+def record_stage(name: str, duration: float, items_in: int = 0, items_out: int = 0, nbytes: int = 0) -> None:
+    """Record pre-measured work on the active run report, if any."""
+    report = _current_report.get()
+    if report is None:
+        return
+    span = Span(name, items_in)
+    span.items_out = items_out
+    span.bytes = nbytes
+    report.record(span, duration)
+
+def record_api_call(result=None) -> None:
+    """Attribute an outbound API call, its token usage and response size to the active span."""
+    span = _current_span.get()
+    if span is None:
+        return
+    tokens = 0
+    metrics = getattr(result, "metrics", None)
+    if isinstance(metrics, dict):
+        total = metrics.get("total_tokens", 0)
+        tokens = sum(total) if isinstance(total, list) else int(total or 0)
+    content = getattr(result, "content", None)
+    nbytes = len(content) if isinstance(content, (bytes, str)) else 0
+    span.record_api_call(tokens, nbytes)
+
+Counters = Dict[str, Dict[str, float]]
+
+class MetricsRegistry:
+    """Process-wide counters across all runs, rendered in Prometheus text format.
+
+    Counters recorded in other processes (e.g. job workers) are merged in at
+    render time from the sources registered with ``add_source``.
+    """
+
+    def __init__(self):
+        self._counters: Counters = {}
+        self._sources: List[Callable[[], Counters]] = []
+        self._lock = threading.Lock()
+
+    def add_source(self, source: Callable[[], Counters]) -> None:
+        with self._lock:
+            self._sources.append(source)
+
+    def drain(self) -> Counters:
+        """Take the counters recorded so far, resetting them, e.g. to hand them to another process."""
+        with self._lock:
+            counters, self._counters = self._counters, {}
+        return counters
+
+    def observe(self, stage: str, duration: float, span: Span, failed: bool) -> None:
+        values = {
+            "lead_stage_duration_seconds_total": duration,
+            "lead_stage_spans_total": 1,
+            "lead_stage_items_in_total": span.items_in,
+            "lead_stage_items_out_total": span.items_out,
+            "lead_stage_api_calls_total": span.api_calls,
+            "lead_stage_tokens_total": span.tokens,
+            "lead_stage_bytes_total": span.bytes,
+            "lead_stage_errors_total": int(failed),
+        }
+        with self._lock:
+            for name, value in values.items():
+                series = self._counters.setdefault(name, {})
+                series[stage] = series.get(stage, 0) + value
+
+    def render(self) -> str:
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            sources = list(self._sources)
+        for source in sources:
+            try:
+                external = source()
+            except Exception as e:
+                logger.warning(f"Skipping unavailable metrics source: {str(e)}")
+                continue
+            for name, series in external.items():
+                merged = counters.setdefault(name, {})
+                for stage_name, value in series.items():
+                    merged[stage_name] = merged.get(stage_name, 0) + value
+        lines = []
+        for name, series in sorted(counters.items()):
+            lines.append(f"# TYPE {name} counter")
+            for stage_name, value in sorted(series.items()):
+                lines.append(f'{name}{{stage="{stage_name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+METRICS = MetricsRegistry()
+
+_server = None
+_server_lock = threading.Lock()
+
+def start_metrics_server(port: Optional[int] = None) -> Optional[int]:
+    """Serve /metrics on ``port`` (or LEAD_METRICS_PORT) in a daemon thread. No-op if unset or already running."""
+    global _server
+    port = port or int(os.getenv("LEAD_METRICS_PORT", "0"))
+    if not port:
+        return None
+    # http.server is only needed when the endpoint is enabled, so keep it off the startup path
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = METRICS.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+            logger.info(f"Serving pipeline metrics on port {port}")
+        return _server.server_address[1]
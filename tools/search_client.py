@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from tools.rate_limiter import rate_limited_call
+from tools.registry import shared
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Point these at a local stand-in (e.g. the benchmark stub server) to run offline
+FIRECRAWL_API_URL = os.getenv("FIRECRAWL_API_URL", "https://api.firecrawl.dev")
+EXA_API_URL = os.getenv("EXA_API_URL", "https://api.exa.ai")
+
+FIRECRAWL_SEARCH_URL = f"{FIRECRAWL_API_URL}/v1/search"
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivially different queries share a cache entry."""
+    return " ".join(query.lower().split())
+
+class FirecrawlSearchClient:
+    """Shared client for the Firecrawl /v1/search endpoint.
+
+    Keeps a pooled keep-alive ``requests.Session``, caches successful results by
+    normalized query for ``ttl_seconds`` and coalesces identical in-flight
+    searches so concurrent callers share a single HTTP request.
+    """
+
+    def __init__(self, ttl_seconds: float = 15 * 60, max_entries: int = 1000, pool_size: int = 10):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self._cache: Dict[Tuple, Tuple[float, List[dict]]] = {}
+        self._in_flight: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+
+    def search(self, query: str, api_key: str, limit: int = 5, lang: str = "en",
+               location: str = "United States", timeout: int = 60000) -> Optional[List[dict]]:
+        """Return the search result dicts, or None if the request failed."""
+        key = (normalize_query(query), limit, lang, location)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and time.time() - cached[0] <= self.ttl_seconds:
+                logger.debug(f"Search cache hit for query: {query}")
+                return cached[1]
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not is_leader:
+            logger.debug(f"Joining in-flight search for query: {query}")
+            return future.result()
+
+        try:
+            results = self._post(query, api_key, limit, lang, location, timeout)
+            if results is not None:
+                with self._lock:
+                    self._cache[key] = (time.time(), results)
+                    self._evict()
+            future.set_result(results)
+            return results
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _post(self, query: str, api_key: str, limit: int, lang: str, location: str, timeout: int) -> Optional[List[dict]]:
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "query": query,
+            "limit": limit,
+            "lang": lang,
+            "location": location,
+            "timeout": timeout,
+        }
+        response = rate_limited_call("firecrawl", self.session.post, FIRECRAWL_SEARCH_URL, json=payload, headers=headers)
+        if response.status_code == 200:
+            data = response.json()
+            if data.get("success"):
+                return data.get("data", [])
+        logger.error(f"Firecrawl search failed. Status code: {response.status_code}")
+        return None
+
+    def _evict(self) -> None:
+        # Drop expired entries, then the oldest ones if still over capacity
+        now = time.time()
+        for key in [k for k, (created, _) in self._cache.items() if now - created > self.ttl_seconds]:
+            del self._cache[key]
+        overflow = len(self._cache) - self.max_entries
+        if overflow > 0:
+            for key in sorted(self._cache, key=lambda k: self._cache[k][0])[:overflow]:
+                del self._cache[key]
+
+def get_search_client() -> FirecrawlSearchClient:
+    """Return the process-wide search client shared by the app and the crew tools."""
+    return shared("firecrawl_search_client", FirecrawlSearchClient)
+
+def get_exa_client(api_key: str):
+    """Return the process-wide Exa SDK client for an API key."""
+    from exa_py import Exa
+    return shared(("exa_client", api_key), lambda: Exa(api_key=api_key, base_url=EXA_API_URL))
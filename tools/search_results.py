@@ -0,0 +1,85 @@
+import json
+from typing import Iterable, List, Optional
+from urllib.parse import urlsplit
+from pydantic import BaseModel, Field
+from tools.fanout_search import canonical_url
+from tools.lead_records import LeadRecord
+
+# Snippets are trimmed to this many characters; the agents only need enough to judge relevance
+MAX_SNIPPET_CHARS = 300
+
+class SearchResult(BaseModel):
+    """One search hit as handed to the agents and to the non-LLM lead path."""
+
+    url: str
+    title: Optional[str] = None
+    snippet: Optional[str] = None
+    platform: Optional[str] = None
+    author: Optional[str] = None
+    published: Optional[str] = None
+    hits: Optional[int] = None
+    # Pre-canonicalization URL (e.g. a Quora answer); only used to attribute the lead, never sent to the agents
+    source_url: Optional[str] = Field(default=None, exclude=True)
+
+def platform_of(url: str) -> str:
+    """Site a result came from, e.g. "quora" for www.quora.com / m.quora.com."""
+    host = (urlsplit(url).hostname or "").lower()
+    parts = host.split(".")
+    return parts[-2] if len(parts) >= 2 else host
+
+def _trim(text: Optional[str]) -> Optional[str]:
+    if not text:
+        return None
+    text = " ".join(text.split())
+    return text if len(text) <= MAX_SNIPPET_CHARS else text[:MAX_SNIPPET_CHARS - 1] + "…"
+
+def result_from_dict(result: dict) -> SearchResult:
+    """Build a SearchResult from a Firecrawl, Exa REST or fan-out result dict."""
+    url = result.get("url") or ""
+    highlights = result.get("highlights")
+    snippet = " ".join(highlights) if highlights else result.get("snippet") or result.get("description") or result.get("text")
+    return SearchResult(
+        url=url,
+        title=result.get("title") or None,
+        snippet=_trim(snippet),
+        platform=platform_of(url),
+        author=result.get("author") or None,
+        published=result.get("publishedDate") or result.get("published") or None,
+        hits=result.get("hits"),
+        source_url=result.get("source_url") if result.get("source_url") != url else None,
+    )
+
+def result_from_exa(result) -> SearchResult:
+    """Build a SearchResult from an exa_py result object."""
+    return result_from_dict({
+        "url": result.url,
+        "title": getattr(result, "title", None),
+        "highlights": getattr(result, "highlights", None),
+        "author": getattr(result, "author", None),
+        "publishedDate": getattr(result, "published_date", None),
+    })
+
+def results_to_json(results: Iterable[SearchResult]) -> str:
+    """Minimal JSON for the agents: no empty fields, no whitespace."""
+    return json.dumps([result.model_dump(exclude_none=True) for result in results], separators=(",", ":"), ensure_ascii=False)
+
+def result_to_lead(result: SearchResult) -> LeadRecord:
+    """Map a search hit straight onto the flattened lead schema, without an agent in between.
+
+    Search only knows the page, so the lead is its author: the answerer of a
+    Quora answer URL (/<question>/answer/<User-Name>), otherwise the author the
+    source reports. Other Quora URLs are recorded as question threads. Merged
+    fan-out results carry the answer URL in ``source_url``, since ``url`` is
+    already canonicalized onto the thread.
+    """
+    url = canonical_url(result.url) or result.url
+    username = result.author or ""
+    post_type = "question" if result.platform == "quora" else "post"
+    segments = [segment for segment in urlsplit(result.source_url or result.url).path.split("/") if segment]
+    if result.platform == "quora" and "answer" in segments[1:-1]:
+        username = segments[segments.index("answer", 1) + 1].replace("-", " ")
+        post_type = "answer"
+    return LeadRecord(url, username, "", post_type, result.published or "", 0, ())
+
+def results_to_leads(results: Iterable[SearchResult]) -> List[LeadRecord]:
+    return [result_to_lead(result) for result in results]
@@ -1,8 +1,7 @@
 from crewai.tools import BaseTool
 from typing import Type, List, Dict
 from pydantic import BaseModel, Field
-from composio_phidata import Action, ComposioToolSet
-import os
+from tools.sheets_writer import get_sheets_writer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,21 +18,10 @@ class GoogleSheetsTool(BaseTool):
     def _run(self, data: List[Dict], sheet_name: str = "Leads") -> str:
         logger.info(f"Attempting Google Sheets write operation for {len(data)} records")
         try:
-            composio_toolset = ComposioToolSet(api_key=os.getenv("COMPOSIO_API_KEY"))
-            sheets_tool = composio_toolset.get_tools(
-                actions=[Action.GOOGLESHEETS_SHEET_FROM_JSON]
-            )[0]
-            
-            result = sheets_tool.run({
-                "data": data,
-                "sheet_name": sheet_name
-            })
-            
-            if "https://docs.google.com/spreadsheets" in result:
-                sheet_url = result.split("https://docs.google.com/spreadsheets/d/")[1].split(" ")[0]
-                full_url = f"https://docs.google.com/spreadsheets/d/{sheet_url}"
-                logger.info(f"Successfully created Google Sheet: {full_url}")
-                return full_url
+            sheet_url = get_sheets_writer().write(data, title=sheet_name, sheet_name=sheet_name)
+            if sheet_url:
+                logger.info(f"Successfully created Google Sheet: {sheet_url}")
+                return sheet_url
             
             logger.warning("Failed to create Google Sheet")
             return "Failed to create Google Sheet"
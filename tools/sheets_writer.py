@@ -0,0 +1,107 @@
+import os
+import re
+from typing import Any, Dict, List, Optional
+from composio import Action, ComposioToolSet
+from tools.lead_records import LEAD_FIELDNAMES, lead_row
+from tools.rate_limiter import rate_limited_call
+from tools.registry import shared
+import logging
+
+logger = logging.getLogger(__name__)
+
+SHEET_URL_PREFIX = "https://docs.google.com/spreadsheets/d/"
+
+def find_spreadsheet_id(response: Any) -> Optional[str]:
+    """Pull the spreadsheet id out of a Composio action response, wherever it is nested."""
+    if isinstance(response, dict):
+        for key in ("spreadsheetId", "spreadsheet_id", "id"):
+            value = response.get(key)
+            if isinstance(value, str) and value:
+                return value
+        for value in response.values():
+            found = find_spreadsheet_id(value)
+            if found:
+                return found
+    elif isinstance(response, list):
+        for value in response:
+            found = find_spreadsheet_id(value)
+            if found:
+                return found
+    elif isinstance(response, str):
+        match = re.search(r"/spreadsheets/d/([A-Za-z0-9_-]+)", response)
+        if match:
+            return match.group(1)
+    return None
+
+class GoogleSheetsWriter:
+    """Writes lead records to Google Sheets through Composio actions directly, with no LLM involved.
+
+    The first batch creates the sheet with GOOGLESHEETS_SHEET_FROM_JSON; later
+    batches (and writes to an existing ``spreadsheet_id``) are appended with
+    GOOGLESHEETS_BATCH_UPDATE. Pass ``toolset`` or ``base_url`` (or set
+    COMPOSIO_BASE_URL) to run against a local stand-in for the Composio API.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, batch_size: int = 500, base_url: Optional[str] = None,
+                 toolset: Optional[ComposioToolSet] = None):
+        self.batch_size = batch_size
+        if toolset is None:
+            base_url = base_url or os.getenv("COMPOSIO_BASE_URL")
+            kwargs = {"base_url": base_url} if base_url else {}
+            toolset = ComposioToolSet(api_key=api_key or os.getenv("COMPOSIO_API_KEY"), **kwargs)
+        self.toolset = toolset
+
+    def _execute(self, action: Action, params: Dict) -> Dict:
+        response = rate_limited_call("composio", self.toolset.execute_action, action=action, params=params)
+        if isinstance(response, dict) and response.get("successful") is False:
+            raise RuntimeError(f"{action} failed: {response.get('error')}")
+        return response
+
+    def write(self, records: List[Dict], title: str = "Leads", sheet_name: str = "Sheet1",
+              spreadsheet_id: Optional[str] = None, columns: Optional[List[str]] = None) -> Optional[str]:
+        """Write records in batches and return the sheet URL, or None if there was nothing to write."""
+        if not records:
+            return None
+        columns = columns or list(records[0].keys())
+        start = 0
+        if spreadsheet_id is None:
+            first_batch = [{column: record.get(column, "") for column in columns} for record in records[:self.batch_size]]
+            response = self._execute(Action.GOOGLESHEETS_SHEET_FROM_JSON, {
+                "title": title,
+                "sheet_name": sheet_name,
+                "sheet_json": first_batch,
+            })
+            spreadsheet_id = find_spreadsheet_id(response)
+            if not spreadsheet_id:
+                raise RuntimeError("Could not find the spreadsheet id in the Composio response")
+            start = len(first_batch)
+            logger.info(f"Created Google Sheet {spreadsheet_id} with {start} rows")
+
+        for offset in range(start, len(records), self.batch_size):
+            batch = records[offset:offset + self.batch_size]
+            # Omitting first_cell_location appends after the last populated row
+            self._execute(Action.GOOGLESHEETS_BATCH_UPDATE, {
+                "spreadsheet_id": spreadsheet_id,
+                "sheet_name": sheet_name,
+                "values": [_row(record, columns) for record in batch],
+            })
+            logger.info(f"Appended {len(batch)} rows to Google Sheet {spreadsheet_id}")
+
+        return f"{SHEET_URL_PREFIX}{spreadsheet_id}"
+
+def get_sheets_writer(api_key: Optional[str] = None) -> GoogleSheetsWriter:
+    """Process-wide GoogleSheetsWriter (and Composio toolset) per API key."""
+    api_key = api_key or os.getenv("COMPOSIO_API_KEY")
+    return shared(("sheets_writer", api_key), lambda: GoogleSheetsWriter(api_key=api_key))
+
+def _row(record, columns: List[str]) -> List:
+    if columns == LEAD_FIELDNAMES:
+        return [_cell(value) for value in lead_row(record)]
+    return [_cell(record.get(column, "")) for column in columns]
+
+def _cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(v) for v in value)
+    return value
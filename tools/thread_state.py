@@ -0,0 +1,166 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from tools.pending_writes import PendingWrites
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_PATH = "lead_generation_cache/thread_state.sqlite"
+
+# Counts and relative dates ("1.2K views", "Updated 3y") change on every visit without any new content
+_VOLATILE = re.compile(r"\d+(?:[.,]\d+)*[a-z]?")
+
+def content_hash(markdown: str) -> str:
+    """Hash a scraped page so only real content changes (e.g. a new answer) alter the digest."""
+    normalized = " ".join(_VOLATILE.sub("", (markdown or "").lower()).split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+def interaction_key(interaction: dict) -> str:
+    """Identity of an interaction within its thread.
+
+    Quora allows one answer per user per question, so normalized username and
+    post type identify it; timestamps are relative ("2y") and drift between crawls.
+    """
+    username = " ".join((interaction.get("username") or "").lower().split())
+    post_type = (interaction.get("post_type") or "").strip().lower()
+    return f"{username}\n{post_type}"
+
+class ThreadState(NamedTuple):
+    url: str
+    content_hash: str
+    last_extracted: float
+    last_checked: float
+
+class ThreadStateStore:
+    """Persistent per-thread crawl state for incremental recrawls.
+
+    For each URL it records the last extraction time, the hash of the page
+    content at that time and the interactions already emitted, so a recrawl
+    can skip unchanged pages and pass on only interactions it hasn't seen.
+    """
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS threads (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                last_extracted REAL NOT NULL,
+                last_checked REAL NOT NULL
+            ) WITHOUT ROWID"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS thread_interactions (
+                url TEXT NOT NULL,
+                interaction_key TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                PRIMARY KEY (url, interaction_key)
+            ) WITHOUT ROWID"""
+        )
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[ThreadState]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, content_hash, last_extracted, last_checked FROM threads WHERE url = ?", (url,)
+            ).fetchone()
+        return ThreadState(*row) if row else None
+
+    def is_unchanged(self, url: str, digest: str) -> bool:
+        """Return True, and record the check, if the thread was extracted before and still hashes to ``digest``."""
+        with self._lock:
+            row = self._conn.execute("SELECT content_hash FROM threads WHERE url = ?", (url,)).fetchone()
+            if row is None or not digest or row[0] != digest:
+                return False
+            self._conn.execute("UPDATE threads SET last_checked = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        return True
+
+    def _new_interactions(self, url: str, interactions: Iterable[dict], seen: Set[str]) -> Tuple[List[dict], List[str]]:
+        """Interactions not stored for ``url`` nor in ``seen``, and their keys (which are added to ``seen``)."""
+        with self._lock:
+            seen.update(key for (key,) in self._conn.execute(
+                "SELECT interaction_key FROM thread_interactions WHERE url = ?", (url,)
+            ))
+        new_interactions, new_keys = [], []
+        for interaction in interactions:
+            key = interaction_key(interaction)
+            if key not in seen:
+                seen.add(key)
+                new_interactions.append(interaction)
+                new_keys.append(key)
+        return new_interactions, new_keys
+
+    def record(self, extractions: Iterable[Tuple[str, str, List[str]]]) -> None:
+        """Store extractions as (url, content hash, new interaction keys) in one transaction."""
+        now = time.time()
+        with self._lock:
+            for url, digest, keys in extractions:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO thread_interactions (url, interaction_key, first_seen) VALUES (?, ?, ?)",
+                    [(url, key, now) for key in keys]
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO threads (url, content_hash, last_extracted, last_checked) VALUES (?, ?, ?, ?)",
+                    (url, digest or "", now, now)
+                )
+            self._conn.commit()
+
+    def record_extraction(self, url: str, digest: str, interactions: Iterable[dict]) -> List[dict]:
+        """Store a fresh extraction of ``url`` and return only the interactions not seen before."""
+        new_interactions, new_keys = self._new_interactions(url, interactions, set())
+        self.record([(url, digest, new_keys)])
+        return new_interactions
+
+    def deferred(self, pending: PendingWrites) -> "DeferredThreadState":
+        """View that filters like this store but only records extractions when ``pending`` is committed."""
+        return DeferredThreadState(self, pending)
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM threads").fetchone()
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class DeferredThreadState:
+    """ThreadStateStore view for one run: extractions are staged until the run's output is committed."""
+
+    def __init__(self, store: ThreadStateStore, pending: PendingWrites):
+        self.store = store
+        # url -> (content hash, interaction keys seen so far, keys staged by this run)
+        self._staged: Dict[str, Tuple[str, Set[str], List[str]]] = {}
+        self._lock = threading.Lock()
+        pending.on_commit(self._flush)
+
+    def get(self, url: str) -> Optional[ThreadState]:
+        return self.store.get(url)
+
+    def is_unchanged(self, url: str, digest: str) -> bool:
+        return self.store.is_unchanged(url, digest)
+
+    def record_extraction(self, url: str, digest: str, interactions: Iterable[dict]) -> List[dict]:
+        with self._lock:
+            _, seen, staged_keys = self._staged.get(url, ("", set(), []))
+            new_interactions, new_keys = self.store._new_interactions(url, interactions, seen)
+            self._staged[url] = (digest, seen, staged_keys + new_keys)
+        return new_interactions
+
+    def _flush(self) -> None:
+        with self._lock:
+            staged, self._staged = self._staged, {}
+        self.store.record((url, digest, keys) for url, (digest, _, keys) in staged.items())
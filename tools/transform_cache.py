@@ -0,0 +1,60 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "lead_generation_cache/transform_cache.sqlite"
+
+def normalize_user_query(query: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so near-identical queries match."""
+    return " ".join(re.sub(r"[^\w\s]", " ", query.lower()).split())
+
+class TransformCache:
+    """SQLite-backed cache of transformed company descriptions keyed by normalized user query."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_seconds: float = 30 * 24 * 3600):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS transform_cache (
+                query TEXT PRIMARY KEY,
+                description TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def get(self, user_query: str) -> Optional[str]:
+        key = normalize_user_query(user_query)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT description, created_at FROM transform_cache WHERE query = ?", (key,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return None
+        logger.debug(f"Transform cache hit for query: {key}")
+        return row[0]
+
+    def set(self, user_query: str, description: str) -> None:
+        key = normalize_user_query(user_query)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transform_cache (query, description, created_at) VALUES (?, ?, ?)",
+                (key, description, time.time())
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()